@@ -1,14 +1,16 @@
 """
 Agent for posting NBA box scores.
 """
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Any
 from loguru import logger
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, update
 
-from clients import TwitterClient, NBAClient
 from analyzers import BoxScoreFormatter
-from database import BoxScorePost, DatabaseManager
+from database import BoxScorePost, DatabaseManager, existing_values, insert_if_absent
+from utils.timeutils import parse_game_date, utc_now
+
+if TYPE_CHECKING:
+    from clients import TwitterClient, NBAClient
 
 
 class BoxScoreAgent:
@@ -16,8 +18,8 @@ class BoxScoreAgent:
     
     def __init__(
         self,
-        twitter_client: TwitterClient,
-        nba_client: NBAClient,
+        twitter_client: "TwitterClient",
+        nba_client: "NBAClient",
         db_manager: DatabaseManager
     ):
         """
@@ -39,8 +41,6 @@ class BoxScoreAgent:
         """
         logger.info("Checking for completed games to post")
         
-        session = self.db_manager.get_session()
-        
         try:
             # Get completed games from today
             games = self.nba_client.get_completed_games_today()
@@ -51,37 +51,37 @@ class BoxScoreAgent:
             
             logger.info(f"Found {len(games)} completed games")
             
-            # Process each game
+            # Look up which games were already posted in one query
+            with self.db_manager.session_scope() as session:
+                posted_ids = existing_values(session, BoxScorePost.game_id, (game['game_id'] for game in games))
+            
+            # Process each game; each one uses its own short transactions, so
+            # no database lock is held across the NBA/Twitter calls
             for game in games:
-                self._post_game_box_score(game, session)
+                if game['game_id'] in posted_ids:
+                    logger.info(f"Game {game['game_id']} already posted, skipping")
+                    continue
+                self._post_game_box_score(game)
             
-            session.commit()
             logger.info("Successfully processed all box scores")
             
         except Exception as e:
             logger.error(f"Error posting box scores: {e}")
-            session.rollback()
-        finally:
-            session.close()
     
-    def _post_game_box_score(self, game: Dict[str, Any], session: Session):
+    def _post_game_box_score(self, game: Dict[str, Any]):
         """
-        Post a single game's box score.
+        Post a single game's box score (the caller skips games already posted).
+        
+        The game's row is reserved before posting and dropped again if the
+        post fails, so a failed game is retried on the next run.
         
         Args:
             game: Game data dictionary
-            session: Database session
         """
         game_id = game['game_id']
         
         logger.info(f"Processing game {game_id}")
         
-        # Check if already posted
-        existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-        if existing:
-            logger.info(f"Game {game_id} already posted, skipping")
-            return
-        
         try:
             # Get all player stats for detailed analysis
             team_stats = self.nba_client.get_all_players_stats(game_id)
@@ -94,26 +94,38 @@ class BoxScoreAgent:
             else:
                 tweet_text = self.formatter.format_game_summary(game)
             
-            logger.info(f"Posting box score for game {game_id}")
-            
-            # Post to Twitter
-            tweet_id = self.twitter_client.post_tweet(tweet_text)
+            # Reserve the game's row before posting, so an mcp_server post of the
+            # same game running concurrently can't tweet it a second time
+            with self.db_manager.session_scope() as session:
+                claimed = insert_if_absent(session, BoxScorePost, {
+                    "game_id": game_id,
+                    "game_date": parse_game_date(game['game_date']),
+                    "home_team": game['home_team'],
+                    "away_team": game['away_team'],
+                    "home_score": game.get('home_score', 0),
+                    "away_score": game.get('away_score', 0),
+                    "post_text": tweet_text,
+                    "tweet_id": None,
+                    "posted_at": utc_now()
+                })
+            if not claimed:
+                logger.info(f"Game {game_id} was posted concurrently, skipping")
+                return
             
-            # Create database record
-            box_score_post = BoxScorePost(
-                game_id=game_id,
-                game_date=datetime.strptime(game['game_date'], "%Y-%m-%d"),
-                home_team=game['home_team'],
-                away_team=game['away_team'],
-                home_score=game.get('home_score', 0),
-                away_score=game.get('away_score', 0),
-                post_text=tweet_text,
-                tweet_id=tweet_id,
-                posted_at=datetime.utcnow()
-            )
+            logger.info(f"Posting box score for game {game_id}")
             
-            session.add(box_score_post)
-            session.flush()
+            # Post to Twitter, then record the tweet on the reserved row, or
+            # drop the reservation if posting failed or raised
+            tweet_id = None
+            try:
+                tweet_id = self.twitter_client.post_tweet(tweet_text)
+            finally:
+                with self.db_manager.session_scope() as session:
+                    reserved = BoxScorePost.game_id == game_id
+                    if tweet_id:
+                        session.execute(update(BoxScorePost).where(reserved).values(tweet_id=tweet_id))
+                    else:
+                        session.execute(delete(BoxScorePost).where(reserved))
             
             if tweet_id:
                 logger.info(f"Successfully posted box score for game {game_id} as tweet {tweet_id}")
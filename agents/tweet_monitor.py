@@ -1,14 +1,16 @@
 """
 Agent for monitoring and processing tweets.
 """
-from typing import Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from clients import TwitterClient
-from analyzers import InjuryDetector
-from database import ProcessedTweet, DatabaseManager
+from database import ProcessedTweet, DatabaseManager, existing_values
+from utils.timeutils import utc_now
+
+if TYPE_CHECKING:
+    from clients import TwitterClient
+    from analyzers import InjuryDetector
 
 
 class TweetMonitorAgent:
@@ -16,8 +18,8 @@ class TweetMonitorAgent:
     
     def __init__(
         self,
-        twitter_client: TwitterClient,
-        injury_detector: InjuryDetector,
+        twitter_client: "TwitterClient",
+        injury_detector: "InjuryDetector",
         db_manager: DatabaseManager,
         target_username: str
     ):
@@ -63,11 +65,12 @@ class TweetMonitorAgent:
         """
         logger.info(f"Checking for new tweets from @{self.target_username}")
         
-        session = self.db_manager.get_session()
-        
         try:
-            # Get the last processed tweet ID
-            since_id = self.get_last_processed_tweet_id(session)
+            # Database scopes stay short: no pooled connection is held
+            # across the Twitter and Claude calls
+            with self.db_manager.session_scope() as session:
+                # Get the last processed tweet ID
+                since_id = self.get_last_processed_tweet_id(session)
             
             # Fetch new tweets
             tweets = self.twitter_client.get_user_recent_tweets(
@@ -82,38 +85,37 @@ class TweetMonitorAgent:
             
             logger.info(f"Found {len(tweets)} new tweets")
             
+            # Look up which tweets were already processed in one query
+            with self.db_manager.session_scope() as session:
+                processed_ids = existing_values(session, ProcessedTweet.tweet_id, (tweet['id'] for tweet in tweets))
+            
             # Process each tweet
             for tweet in tweets:
-                self._process_single_tweet(tweet, session)
+                if tweet['id'] in processed_ids:
+                    logger.info(f"Tweet {tweet['id']} already processed, skipping")
+                    continue
+                self._process_single_tweet(tweet)
             
-            session.commit()
             logger.info("Successfully processed all new tweets")
             
         except Exception as e:
             logger.error(f"Error processing tweets: {e}")
-            session.rollback()
-        finally:
-            session.close()
     
-    def _process_single_tweet(self, tweet: dict, session: Session):
+    def _process_single_tweet(self, tweet: dict):
         """
-        Process a single tweet.
+        Process a single tweet (the caller skips tweets already processed).
+        
+        The tweet is analyzed and reposted outside any transaction; its
+        record is then saved in a short one of its own.
         
         Args:
             tweet: Tweet data dictionary
-            session: Database session
         """
         tweet_id = tweet['id']
         tweet_text = tweet['text']
         
         logger.info(f"Processing tweet {tweet_id}")
         
-        # Check if already processed
-        existing = session.query(ProcessedTweet).filter_by(tweet_id=tweet_id).first()
-        if existing:
-            logger.info(f"Tweet {tweet_id} already processed, skipping")
-            return
-        
         # Analyze for injury content
         analysis = self.injury_detector.is_injury_related(tweet_text)
         is_injury = analysis.get('is_injury', False)
@@ -131,7 +133,7 @@ class TweetMonitorAgent:
             tweet_text=tweet_text,
             is_injury_related=is_injury,
             reposted=False,
-            processed_at=datetime.utcnow()
+            processed_at=utc_now()
         )
         
         # If injury-related and high confidence, repost it
@@ -147,6 +149,6 @@ class TweetMonitorAgent:
             else:
                 logger.warning(f"Failed to repost tweet {tweet_id}")
         
-        session.add(processed_tweet)
-        session.flush()
+        with self.db_manager.session_scope() as session:
+            session.add(processed_tweet)
 
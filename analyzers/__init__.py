@@ -1,6 +1,26 @@
 """Analyzers package."""
-from .injury_detector import InjuryDetector
-from .box_score_formatter import BoxScoreFormatter
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["InjuryDetector", "BoxScoreFormatter"]
+# Imported on first access so e.g. BoxScoreFormatter doesn't pull in the anthropic SDK
+_LAZY_IMPORTS = {
+    "InjuryDetector": ".injury_detector",
+    "BoxScoreFormatter": ".box_score_formatter",
+    "KeywordMatcher": ".keyword_matcher",
+}
 
+__all__ = ["InjuryDetector", "BoxScoreFormatter", "KeywordMatcher"]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if TYPE_CHECKING:
+    from .injury_detector import InjuryDetector
+    from .box_score_formatter import BoxScoreFormatter
+    from .keyword_matcher import KeywordMatcher
@@ -83,8 +83,7 @@ class BoxScoreFormatter:
             
             # Check for double-doubles and triple-doubles
             for player in players:
-                stats = [player['points'], player['rebounds'], player['assists']]
-                double_digit_stats = sum(1 for s in stats if s >= 10)
+                double_digit_stats = (player['points'] >= 10) + (player['rebounds'] >= 10) + (player['assists'] >= 10)
                 
                 # Check if this is leading scorer, double-double, or triple-double
                 is_leader = player['player_name'] == leading_scorer['player_name']
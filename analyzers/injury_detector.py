@@ -7,30 +7,8 @@ from loguru import logger
 from config import settings
 import json
 
-
-class InjuryDetector:
-    """Detect injury-related content in tweets using AI."""
-    
-    def __init__(self):
-        """Initialize the injury detector with Claude client."""
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        
-    def is_injury_related(self, tweet_text: str) -> Dict[str, Any]:
-        """
-        Analyze if a tweet is related to NBA player injuries.
-        
-        Args:
-            tweet_text: The text of the tweet to analyze
-            
-        Returns:
-            Dictionary with 'is_injury': bool, 'confidence': float, 'summary': str
-        """
-        try:
-            prompt = f"""You are analyzing a tweet from an NBA insider to determine if it reports a player injury or injury-related news.
-
-Tweet: "{tweet_text}"
-
-MARK AS INJURY (is_injury: true) if the tweet mentions:
+# What counts as injury news, shared by the classification prompts
+INJURY_CRITERIA = """MARK AS INJURY (is_injury: true) if the tweet mentions:
 - Player is injured, hurt, or suffers an injury
 - Player will miss games due to injury
 - Player is out/questionable/doubtful/probable due to injury
@@ -43,7 +21,12 @@ DO NOT mark as injury if:
 - Player is resting (not injured)
 - General team news or trades
 - Contract signings
-- Player returning from injury (already healed) - UNLESS it specifically mentions timeline or injury details
+- Player returning from injury (already healed) - UNLESS it specifically mentions timeline or injury details"""
+
+# Static instructions for each Claude call; only the tweet goes in the user message
+INJURY_ANALYSIS_SYSTEM_PROMPT = f"""You are analyzing a tweet from an NBA insider to determine if it reports a player injury or injury-related news.
+
+{INJURY_CRITERIA}
 
 Respond with ONLY a JSON object (no other text):
 {{
@@ -53,13 +36,76 @@ Respond with ONLY a JSON object (no other text):
 }}
 
 Be liberal with marking injuries - if there's any mention of a player being hurt or injured, mark it as injury-related."""
+
+REPOST_COMMENT_SYSTEM_PROMPT = """Generate a very brief comment (max 50 characters) for the injury news tweet you are given.
+Be professional and informative.
+
+Examples: "Injury Update 🏀", "Breaking: Injury News", "Latest Injury Report"
+
+Respond with ONLY the comment text, nothing else."""
+
+# One call returns the verdict and, for injury news, the tweet to post
+CLASSIFY_AND_SUMMARIZE_SYSTEM_PROMPT = f"""You are analyzing a tweet from an NBA insider to determine if it reports a player injury or injury-related news.
+
+{INJURY_CRITERIA}
+
+Be liberal with marking injuries - if there's any mention of a player being hurt or injured, mark it as injury-related.
+
+If it is injury news, also write a concise, original tweet (max 280 chars) summarizing it:
+- Be informative and clear
+- Include player name, team, injury type
+- Include timeline if mentioned (weeks out, questionable, etc.)
+- Use 🏥 emoji
+- Don't copy the original verbatim - rewrite in your own words
+
+Report your answer with the report_injury tool."""
+
+INJURY_REPORT_TOOL = {
+    "name": "report_injury",
+    "description": "Report whether a tweet is injury news, with a summary tweet if it is.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "is_injury": {"type": "boolean"},
+            "confidence": {
+                "type": "number",
+                "description": "0.0 to 1.0 (how certain you are)"
+            },
+            "summary": {
+                "type": "string",
+                "description": "Original tweet summarizing the injury news, or an empty string if it is not injury news"
+            }
+        },
+        "required": ["is_injury", "confidence", "summary"]
+    }
+}
+
+
+class InjuryDetector:
+    """Detect injury-related content in tweets using AI."""
+    
+    def __init__(self):
+        """Initialize the injury detector with Claude client."""
+        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        
+    def is_injury_related(self, tweet_text: str) -> Dict[str, Any]:
+        """
+        Analyze if a tweet is related to NBA player injuries.
+        
+        Args:
+            tweet_text: The text of the tweet to analyze
             
+        Returns:
+            Dictionary with 'is_injury': bool, 'confidence': float, 'summary': str
+        """
+        try:
             response = self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=200,
                 temperature=0.3,
+                system=INJURY_ANALYSIS_SYSTEM_PROMPT,
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": f'Tweet: "{tweet_text}"'}
                 ]
             )
             
@@ -84,6 +130,48 @@ Be liberal with marking injuries - if there's any mention of a player being hurt
                 "summary": f"Error during analysis: {str(e)}"
             }
     
+    def classify_and_summarize(self, tweet_text: str) -> Dict[str, Any]:
+        """
+        Classify a tweet and write the summary tweet in a single Claude call.
+        
+        Args:
+            tweet_text: The text of the tweet to analyze
+            
+        Returns:
+            Dictionary with 'is_injury': bool, 'confidence': float, 'summary': str
+            (the tweet to post; empty if not injury news)
+        """
+        try:
+            response = self.client.messages.create(
+                model="claude-sonnet-4-20250514",
+                max_tokens=400,
+                temperature=0.3,
+                system=CLASSIFY_AND_SUMMARIZE_SYSTEM_PROMPT,
+                tools=[INJURY_REPORT_TOOL],
+                tool_choice={"type": "tool", "name": INJURY_REPORT_TOOL["name"]},
+                messages=[
+                    {"role": "user", "content": f'Tweet: "{tweet_text}"'}
+                ]
+            )
+            
+            result = next(block.input for block in response.content if block.type == "tool_use")
+            
+            logger.info(
+                f"Injury analysis: {result['is_injury']} "
+                f"(confidence: {result['confidence']}) - {result['summary']}"
+            )
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error analyzing tweet for injuries: {e}")
+            # Return conservative default
+            return {
+                "is_injury": False,
+                "confidence": 0.0,
+                "summary": f"Error during analysis: {str(e)}"
+            }
+    
     def generate_repost_comment(self, original_tweet: str) -> Optional[str]:
         """
         Generate a brief comment for reposting an injury tweet.
@@ -95,21 +183,13 @@ Be liberal with marking injuries - if there's any mention of a player being hurt
             Generated comment text or None if failed
         """
         try:
-            prompt = f"""Generate a very brief comment (max 50 characters) for this injury news tweet.
-Be professional and informative.
-
-Examples: "Injury Update 🏀", "Breaking: Injury News", "Latest Injury Report"
-
-Tweet: {original_tweet}
-
-Respond with ONLY the comment text, nothing else."""
-            
             response = self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=30,
                 temperature=0.7,
+                system=REPOST_COMMENT_SYSTEM_PROMPT,
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": f"Tweet: {original_tweet}"}
                 ]
             )
             
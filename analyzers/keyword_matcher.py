@@ -0,0 +1,77 @@
+"""
+Multi-keyword matcher for finding which known terms appear in a piece of text.
+"""
+from typing import Dict, Iterable, Optional, Set
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Find every known term contained in a text, in one pass.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise
+    falls back to one substring check per term. Both give the same result as
+    `term in text` for each term.
+    """
+    
+    def __init__(self, terms: Iterable[str]):
+        self.terms = tuple(dict.fromkeys(terms))
+        self._automaton = None
+        
+        if ahocorasick is not None and self.terms:
+            automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def find(self, text: str) -> Set[str]:
+        """
+        Return the set of terms that occur in text.
+        
+        Args:
+            text: Text to search (matching is case-sensitive)
+        """
+        if self._automaton is not None:
+            return {term for _, term in self._automaton.iter(text)}
+        return {term for term in self.terms if term in text}
+    
+    def count(self, text: str, limit: Optional[int] = None) -> int:
+        """
+        Return how many distinct terms occur in text, stopping at limit.
+        
+        Args:
+            text: Text to search (matching is case-sensitive)
+            limit: Stop scanning once this many terms have matched
+        """
+        if limit is None:
+            return len(self.find(text))
+        
+        if self._automaton is not None:
+            matches = (term for _, term in self._automaton.iter(text))
+        else:
+            matches = (term for term in self.terms if term in text)
+        
+        seen: Set[str] = set()
+        for term in matches:
+            seen.add(term)
+            if len(seen) >= limit:
+                break
+        return len(seen)
+    
+    def find_by_group(self, text: str, groups: Dict[str, str]) -> Dict[str, Set[str]]:
+        """
+        Return matched terms bucketed by group.
+        
+        Args:
+            text: Text to search
+            groups: Mapping of term -> group name
+        """
+        found: Dict[str, Set[str]] = {group: set() for group in groups.values()}
+        for term in self.find(text):
+            found[groups[term]].add(term)
+        return found
@@ -1,6 +1,24 @@
 """Clients package."""
-from .twitter_client import TwitterClient
-from .nba_client import NBAClient
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Imported on first access so e.g. TwitterClient doesn't pull in nba_api
+_LAZY_IMPORTS = {
+    "TwitterClient": ".twitter_client",
+    "NBAClient": ".nba_client",
+}
 
 __all__ = ["TwitterClient", "NBAClient"]
 
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if TYPE_CHECKING:
+    from .twitter_client import TwitterClient
+    from .nba_client import NBAClient
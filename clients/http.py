@@ -0,0 +1,144 @@
+"""
+Shared HTTP session for nba_api (and Twitter) requests.
+Uses a short-lived requests_cache cache for NBA data when requests-cache is installed.
+"""
+import asyncio
+import socket
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from nba_api.library.http import NBAHTTP
+from nba_api.live.nba.library.http import NBALiveHTTP
+
+from config import settings
+
+try:
+    import requests_cache
+except ImportError:  # pragma: no cover - optional dependency
+    requests_cache = None
+
+
+CACHE_NAME = "nba_cache"
+
+# Live data refreshes roughly every 10 seconds, so keep live responses just under that
+LIVE_CACHE_TTL = 8
+STATS_CACHE_TTL = 30
+
+
+# Connection pool / retry settings for the shared session
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[502, 503, 504],
+)
+
+# urllib3's defaults already turn Nagle off (TCP_NODELAY); add TCP keep-alive
+# so idle pooled connections survive between polls instead of being dropped
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# stats.nba.com silently times out clients that burst requests, so calls to it are spaced out
+STATS_URL_PREFIX = "https://stats.nba.com/"
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections use SOCKET_OPTIONS."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+class RateLimitedAdapter(PooledAdapter):
+    """HTTPAdapter that leaves at least min_interval seconds between requests."""
+    
+    def __init__(self, min_interval: float, **kwargs):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        # Holding the lock while sleeping queues concurrent callers in order
+        with self._lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+        return super().send(request, **kwargs)
+
+
+def build_session() -> requests.Session:
+    """
+    Build a pooled session with retries on transient 5xx errors.
+    NBA endpoints are cached if requests-cache is available; nothing else is.
+    """
+    if requests_cache is None:
+        session = requests.Session()
+    else:
+        session = requests_cache.CachedSession(
+            CACHE_NAME,
+            expire_after=requests_cache.DO_NOT_CACHE,
+            urls_expire_after={
+                "cdn.nba.com/static/json/liveData/*": LIVE_CACHE_TTL,
+                "stats.nba.com/*": STATS_CACHE_TTL,
+            },
+        )
+    
+    adapter = PooledAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=RETRY,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    # Cache hits never reach the adapter, so only real requests are throttled
+    if settings.NBA_MIN_CALL_INTERVAL > 0:
+        session.mount(STATS_URL_PREFIX, RateLimitedAdapter(
+            settings.NBA_MIN_CALL_INTERVAL,
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=RETRY,
+        ))
+    return session
+
+
+def install_nba_session(session: Optional[requests.Session] = None) -> requests.Session:
+    """Point the stats and live nba_api HTTP classes at one shared session."""
+    if session is None:
+        session = build_session()
+    NBAHTTP.set_session(session)
+    NBALiveHTTP.set_session(session)
+    return session
+
+
+def reset_nba_session() -> None:
+    """Drop pooled connections and start over with a fresh session."""
+    try:
+        NBAHTTP.get_session().close()
+    except Exception as e:
+        logger.debug(f"Error closing NBA session: {e}")
+    install_nba_session()
+
+
+async def call_nba_api(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking nba_api call in a worker thread so the event loop stays free.
+    On a timeout or dropped connection, resets the session and retries once.
+    """
+    try:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        logger.warning(f"NBA API request failed ({e}), resetting session and retrying")
+        reset_nba_session()
+        return await asyncio.to_thread(func, *args, **kwargs)
@@ -1,19 +1,78 @@
 """
 NBA API client for fetching game data and box scores.
 """
-from typing import List, Dict, Any, Optional
+import heapq
+from operator import itemgetter
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import requests
 from nba_api.stats.endpoints import scoreboardv2, boxscoretraditionalv3, leaguegamefinder
 from nba_api.stats.static import teams
 from loguru import logger
 
+from utils.ttl_cache import ttl_cache
+from .http import install_nba_session, reset_nba_session
+
+# Consecutive timeouts before the HTTP session is thrown away and rebuilt
+MAX_CONSECUTIVE_TIMEOUTS = 2
+
+# How long repeated calls with the same arguments are served from memory
+GAMES_CACHE_TTL = 120
+BOX_SCORE_CACHE_TTL = 300
+
+# Methods wrapped with ttl_cache, for cache_info()/clear_cache()
+CACHED_METHODS = ("get_recent_games", "get_completed_games_today", "get_box_score")
+
 
 class NBAClient:
     """Client for interacting with NBA API."""
     
-    def __init__(self):
-        """Initialize NBA client."""
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Initialize NBA client.
+        
+        Args:
+            session: Shared requests session for nba_api (built if not given)
+        """
         self.teams_data = teams.get_teams()
+        self.session = install_nba_session(session)
+        
+        # Called after repeated timeouts; NBAAgent swaps in one that resets every client
+        self.on_repeated_timeouts: Callable[[], None] = reset_nba_session
+        self._consecutive_timeouts = 0
+        
+        # (games list, {game_id: game}) for the last get_completed_games_today() result
+        self._completed_games_index = (None, {})
+    
+    def use_session(self, session: requests.Session):
+        """Switch nba_api over to a new shared session."""
+        self.session = install_nba_session(session)
+    
+    @staticmethod
+    def cache_info() -> Dict[str, Any]:
+        """Hit/miss counts for the cached NBA API calls."""
+        return {
+            name: getattr(NBAClient, name).cache_info()
+            for name in CACHED_METHODS
+        }
+    
+    @staticmethod
+    def clear_cache():
+        """Drop all cached NBA API results."""
+        for name in CACHED_METHODS:
+            getattr(NBAClient, name).cache_clear()
+    
+    def _record_request_result(self, error: Optional[Exception] = None):
+        """Track consecutive timeouts and reset the session when they pile up."""
+        if not isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            self._consecutive_timeouts = 0
+            return
+        
+        self._consecutive_timeouts += 1
+        if self._consecutive_timeouts >= MAX_CONSECUTIVE_TIMEOUTS:
+            logger.warning(f"{self._consecutive_timeouts} NBA API timeouts in a row, resetting HTTP session")
+            self._consecutive_timeouts = 0
+            self.on_repeated_timeouts()
         
     def get_team_abbreviation(self, team_id: int) -> str:
         """
@@ -45,6 +104,7 @@ class NBAClient:
                 return team['full_name']
         return "Unknown Team"
     
+    @ttl_cache(ttl_seconds=GAMES_CACHE_TTL)
     def get_recent_games(self, days_back: int = 1) -> List[Dict[str, Any]]:
         """
         Get games from the past N days.
@@ -82,6 +142,7 @@ class NBAClient:
             logger.error(f"Error fetching recent games: {e}")
             return []
     
+    @ttl_cache(ttl_seconds=GAMES_CACHE_TTL)
     def get_completed_games_today(self) -> List[Dict[str, Any]]:
         """
         Get all completed games from today.
@@ -95,6 +156,7 @@ class NBAClient:
             games_data = scoreboard.get_normalized_dict()
             
             games = []
+            games_by_id = {}
             if 'GameHeader' in games_data and 'LineScore' in games_data:
                 game_headers = {g['GAME_ID']: g for g in games_data['GameHeader']}
                 
@@ -111,7 +173,7 @@ class NBAClient:
                         continue
                     
                     # Check if we already have this game
-                    existing_game = next((g for g in games if g['game_id'] == game_id), None)
+                    existing_game = games_by_id.get(game_id)
                     
                     if existing_game:
                         # Add score info
@@ -136,14 +198,37 @@ class NBAClient:
                             game['away_score'] = line['PTS']
                         
                         games.append(game)
+                        games_by_id[game_id] = game
             
             logger.info(f"Found {len(games)} completed games today")
+            self._record_request_result()
             return games
             
         except Exception as e:
             logger.error(f"Error fetching completed games: {e}")
+            self._record_request_result(e)
             return []
     
+    def get_completed_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one of today's completed games by ID.
+        
+        Args:
+            game_id: NBA game ID
+            
+        Returns:
+            Game dictionary, or None if it isn't a completed game from today
+        """
+        games = self.get_completed_games_today()
+        
+        # Rebuild the index only when the (cached) games list changes
+        indexed_games, games_by_id = self._completed_games_index
+        if indexed_games is not games:
+            games_by_id = {game['game_id']: game for game in games}
+            self._completed_games_index = (games, games_by_id)
+        return games_by_id.get(game_id)
+    
+    @ttl_cache(ttl_seconds=BOX_SCORE_CACHE_TTL)
     def get_box_score(self, game_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed box score for a specific game.
@@ -171,10 +256,10 @@ class NBAClient:
                 logger.error(f"Empty player stats for game {game_id}")
                 return None
             
-            # Group by team
+            # Group by team; plain dict records avoid building a pandas Series per row
             team_stats = {}
             
-            for _, player in player_df.iterrows():
+            for player in player_df.to_dict('records'):
                 team_id = player['teamId']
                 if team_id not in team_stats:
                     team_stats[team_id] = []
@@ -196,6 +281,7 @@ class NBAClient:
             
             logger.info(f"Successfully fetched box score for game {game_id}: {len(player_df)} players from {len(team_stats)} teams")
             
+            self._record_request_result()
             return {
                 'game_id': game_id,
                 'team_stats': team_stats,
@@ -203,6 +289,7 @@ class NBAClient:
             
         except Exception as e:
             logger.error(f"Error fetching box score for game {game_id}: {e}")
+            self._record_request_result(e)
             return None
     
     def get_top_performers(self, game_id: str, top_n: int = 3) -> Optional[Dict[str, Any]]:
@@ -223,9 +310,8 @@ class NBAClient:
         top_performers = {}
         
         for team_id, players in box_score['team_stats'].items():
-            # Sort by points
-            sorted_players = sorted(players, key=lambda x: x['points'], reverse=True)
-            top_performers[team_id] = sorted_players[:top_n]
+            # Highest scorers first, without sorting the whole roster
+            top_performers[team_id] = heapq.nlargest(top_n, players, key=itemgetter('points'))
         
         return top_performers
     
@@ -244,4 +330,3 @@ class NBAClient:
             return None
         
         return box_score.get('team_stats', {})
-
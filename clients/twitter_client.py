@@ -1,6 +1,7 @@
 """
 Twitter API client for fetching and posting tweets.
 """
+import requests
 import tweepy
 from typing import List, Optional, Dict, Any
 from loguru import logger
@@ -10,8 +11,13 @@ from config import settings
 class TwitterClient:
     """Client for interacting with Twitter API."""
     
-    def __init__(self):
-        """Initialize Twitter client with API credentials."""
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Initialize Twitter client with API credentials.
+        
+        Args:
+            session: Shared requests session to use instead of tweepy's own
+        """
         self.client = tweepy.Client(
             bearer_token=settings.TWITTER_BEARER_TOKEN,
             consumer_key=settings.TWITTER_API_KEY,
@@ -20,6 +26,12 @@ class TwitterClient:
             access_token_secret=settings.TWITTER_ACCESS_TOKEN_SECRET,
             wait_on_rate_limit=True
         )
+        if session is not None:
+            self.use_session(session)
+    
+    def use_session(self, session: requests.Session):
+        """Send Twitter API requests through a shared session."""
+        self.client.session = session
         
     def get_user_recent_tweets(
         self,
@@ -1,5 +1,5 @@
 """Configuration package."""
-from .settings import settings
+from .settings import settings, RuntimeConfig
 
-__all__ = ["settings"]
+__all__ = ["settings", "RuntimeConfig"]
 
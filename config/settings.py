@@ -2,6 +2,8 @@
 Configuration settings for the NBA Agent.
 """
 import os
+from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -38,11 +40,20 @@ class Settings:
     TWEET_CHECK_INTERVAL = int(os.getenv("TWEET_CHECK_INTERVAL", "5"))
     BOX_SCORE_POST_INTERVAL = int(os.getenv("BOX_SCORE_POST_INTERVAL", "60"))
     
+    # Minimum gap between stats.nba.com requests (seconds); it starts timing
+    # out after a burst of quick calls
+    NBA_MIN_CALL_INTERVAL = float(os.getenv("NBA_MIN_CALL_INTERVAL", "0.6"))
+    
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///nba_agent.db")
     
+    # Process tuning (optional - pin the manual agent to one CPU, Linux only)
+    PIN_CPU = int(os.environ["PIN_CPU"]) if os.getenv("PIN_CPU") else None
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    # Keep DEBUG records (with variable values in tracebacks) in the log file
+    DEBUG_LOGS = os.getenv("DEBUG_LOGS", "false").lower() == "true"
     
     @classmethod
     def validate(cls):
@@ -73,5 +84,31 @@ class Settings:
         return True
 
 
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Snapshot of the settings the manual agent needs, taken once at startup."""
+    
+    enable_tweet_monitoring: bool
+    enable_box_score_posting: bool
+    tweet_check_interval: int
+    box_score_post_interval: int
+    target_username: str
+    database_url: str
+    pin_cpu: Optional[int] = None
+    
+    @classmethod
+    def from_settings(cls, source: Settings) -> "RuntimeConfig":
+        """Build a RuntimeConfig from a Settings object."""
+        return cls(
+            enable_tweet_monitoring=source.ENABLE_TWEET_MONITORING,
+            enable_box_score_posting=source.ENABLE_BOX_SCORE_POSTING,
+            tweet_check_interval=source.TWEET_CHECK_INTERVAL,
+            box_score_post_interval=source.BOX_SCORE_POST_INTERVAL,
+            target_username=source.SHAMS_TWITTER_USERNAME,
+            database_url=source.DATABASE_URL,
+            pin_cpu=source.PIN_CPU,
+        )
+
+
 settings = Settings()
 
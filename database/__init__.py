@@ -4,7 +4,10 @@ from .models import (
     ProcessedTweet,
     BoxScorePost,
     AgentLog,
-    Base
+    Base,
+    existing_values,
+    insert_ignoring_duplicates,
+    insert_if_absent
 )
 
 __all__ = [
@@ -12,6 +15,9 @@ __all__ = [
     "ProcessedTweet",
     "BoxScorePost",
     "AgentLog",
-    "Base"
+    "Base",
+    "existing_values",
+    "insert_ignoring_duplicates",
+    "insert_if_absent"
 ]
 
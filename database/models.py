@@ -1,10 +1,16 @@
 """
 Database models for tracking tweets and posts.
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, create_engine
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, create_engine, insert, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+from utils import fast_json
+from utils.timeutils import utc_now
 
 Base = declarative_base()
 
@@ -21,7 +27,20 @@ class ProcessedTweet(Base):
     is_injury_related = Column(Boolean, default=False)
     reposted = Column(Boolean, default=False)
     repost_id = Column(String(50), nullable=True)
-    processed_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, default=utc_now)
+    
+    # ix_processed_author_time serves the "latest processed tweet for this
+    # author" since_id lookup; ix_processed_injury_time is a partial index over
+    # just the injury tweets, for listing them newest first
+    __table_args__ = (
+        Index('ix_processed_author_time', 'author_username', processed_at.desc()),
+        Index(
+            'ix_processed_injury_time',
+            processed_at.desc(),
+            postgresql_where=is_injury_related.is_(True),
+            sqlite_where=is_injury_related.is_(True),
+        ),
+    )
     
     def __repr__(self):
         return f"<ProcessedTweet(tweet_id='{self.tweet_id}', is_injury={self.is_injury_related})>"
@@ -41,7 +60,13 @@ class BoxScorePost(Base):
     away_score = Column(Integer, nullable=False)
     post_text = Column(Text, nullable=False)
     tweet_id = Column(String(50), nullable=True)
-    posted_at = Column(DateTime, default=datetime.utcnow)
+    posted_at = Column(DateTime, default=utc_now)
+    
+    # game_id's unique index serves point lookups and ON CONFLICT; this one
+    # serves the newest-first listing of posted games
+    __table_args__ = (
+        Index('ix_boxscore_posted_at', posted_at.desc()),
+    )
     
     def __repr__(self):
         return f"<BoxScorePost(game_id='{self.game_id}', {self.away_team}@{self.home_team})>"
@@ -53,7 +78,7 @@ class AgentLog(Base):
     __tablename__ = "agent_logs"
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, default=utc_now, index=True)
     log_level = Column(String(20), nullable=False)
     component = Column(String(50), nullable=False)
     message = Column(Text, nullable=False)
@@ -63,21 +88,193 @@ class AgentLog(Base):
         return f"<AgentLog({self.log_level}: {self.component})>"
 
 
+def existing_values(session, column, values: Iterable) -> Set:
+    """
+    Return the subset of values already stored in column, using one query.
+    
+    Runs SELECT column FROM table WHERE column IN (...). On the indexed
+    ID columns this is one index probe per value (SQLite's plan is
+    "SEARCH ... USING COVERING INDEX"), so it stays cheap as the table grows.
+    
+    Args:
+        session: Database session
+        column: Model column to check, e.g. BoxScorePost.game_id
+        values: Candidate values
+    """
+    values = list(values)
+    if not values:
+        return set()
+    return set(session.scalars(select(column).where(column.in_(values))))
+
+
+def _insert_ignoring_conflicts(session, model):
+    """INSERT ... ON CONFLICT DO NOTHING for model, or None if the dialect lacks it."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return None
+
+
+def insert_ignoring_duplicates(session, model, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert plain-dict rows with one executemany, skipping unique-key conflicts.
+    
+    Bypasses the ORM unit of work (no identity map or per-object events).
+    On PostgreSQL and SQLite this is INSERT ... ON CONFLICT DO NOTHING, so a
+    row stored concurrently by another process is skipped rather than
+    failing the whole batch; other databases get a plain INSERT.
+    
+    Args:
+        session: Database session
+        model: Mapped class to insert into, e.g. ProcessedTweet
+        rows: Column-name -> value mappings
+    """
+    if not rows:
+        return
+    stmt = _insert_ignoring_conflicts(session, model)
+    session.execute(stmt if stmt is not None else insert(model), rows)
+
+
+def insert_if_absent(session, model, row: Dict[str, Any]) -> bool:
+    """
+    Insert one row unless it collides with a unique key; return whether it was inserted.
+    
+    A single INSERT ... ON CONFLICT DO NOTHING RETURNING on PostgreSQL and
+    SQLite, so it doubles as a race-free "claim": of several concurrent
+    callers inserting the same key, exactly one gets True. Other databases
+    fall back to an INSERT in a savepoint, treating IntegrityError as a conflict.
+    
+    Args:
+        session: Database session
+        model: Mapped class to insert into, e.g. BoxScorePost
+        row: Column-name -> value mapping
+    """
+    stmt = _insert_ignoring_conflicts(session, model)
+    if stmt is not None:
+        return session.execute(stmt.values(**row).returning(*model.__table__.primary_key)).first() is not None
+    try:
+        with session.begin_nested():
+            session.execute(insert(model).values(**row))
+        return True
+    except IntegrityError:
+        return False
+
+
 class DatabaseManager:
     """Manage database connections and operations."""
     
-    def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+    def __init__(self, database_url: str, pool_size: Optional[int] = None):
+        """
+        Args:
+            database_url: SQLAlchemy database URL
+            pool_size: Hard cap on pooled connections (no overflow); defaults
+                to a pool of 10 with overflow. Ignored for SQLite.
+        """
+        engine_kwargs = {"pool_pre_ping": True, "pool_recycle": 600}
+        if not database_url.startswith("sqlite"):
+            if pool_size is None:
+                engine_kwargs["pool_size"] = 10
+            else:
+                engine_kwargs["pool_size"] = pool_size
+                engine_kwargs["max_overflow"] = 0
+        
+        self.engine = create_engine(
+            database_url,
+            json_serializer=fast_json.dumps,
+            json_deserializer=fast_json.loads,
+            **engine_kwargs
+        )
+        # Nothing queries pending objects without an explicit flush(), so
+        # skip autoflush; objects stay readable after commit without a refresh
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False, autoflush=False)
+        
+        # One session per thread, shared by nested session_scope() blocks
+        self.Session = scoped_session(self.SessionLocal)
+        self._scope = threading.local()
         
     def create_tables(self):
         """Create all tables in the database."""
         Base.metadata.create_all(self.engine)
-        
+        self._add_missing_columns()
+        self._convert_jsonb_columns()
+
+        # create_all() skips tables that already exist, so add any indexes
+        # introduced after the table was first created (GIN indexes need the
+        # JSONB conversion above)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+
+    def _add_missing_columns(self):
+        """Add nullable columns introduced after a table was first created."""
+        inspector = inspect(self.engine)
+        preparer = self.engine.dialect.identifier_preparer
+
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = {col["name"] for col in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing or not column.nullable:
+                        continue
+                    col_type = column.type.compile(dialect=self.engine.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {col_type}"
+                    ))
+
+    def _convert_jsonb_columns(self):
+        """On PostgreSQL, convert columns created as TEXT/JSON before the model switched them to JSONB."""
+        dialect = self.engine.dialect
+        if dialect.name != "postgresql":
+            return
+        inspector = inspect(self.engine)
+        preparer = dialect.identifier_preparer
+
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = {col["name"]: col["type"] for col in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing or isinstance(existing[column.name], postgresql.JSONB):
+                        continue
+                    if not isinstance(column.type.dialect_impl(dialect), postgresql.JSONB):
+                        continue
+                    name = preparer.format_column(column)
+                    conn.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ALTER COLUMN {name} TYPE jsonb USING {name}::jsonb"
+                    ))
+
     def get_session(self):
         """Get a new database session."""
         return self.SessionLocal()
     
+    @contextmanager
+    def session_scope(self):
+        """
+        Provide a transactional scope around a series of operations.
+        
+        Nested scopes on the same thread reuse the outer session; only the
+        outermost scope commits (or rolls back) and releases it.
+        """
+        depth = getattr(self._scope, "depth", 0)
+        session = self.Session()
+        self._scope.depth = depth + 1
+        
+        try:
+            yield session
+            if depth == 0:
+                session.commit()
+        except Exception:
+            if depth == 0:
+                session.rollback()
+            raise
+        finally:
+            self._scope.depth = depth
+            if depth == 0:
+                self.Session.remove()
+    
     def drop_tables(self):
         """Drop all tables (use with caution)."""
         Base.metadata.drop_all(self.engine)
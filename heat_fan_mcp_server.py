@@ -4,24 +4,35 @@ MCP Server for Controversial Miami Heat Fan Bot
 Tracks live Heat games and provides tools for hot takes
 """
 import asyncio
+import hashlib
+import re
+import threading
+from operator import sub
 from typing import Optional, List, Dict, Any
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from mcp.server.fastmcp import FastMCP
+from nba_api.live.nba.endpoints import scoreboard as _scoreboard, boxscore as _live_boxscore
 from loguru import logger
 
 from clients import NBAClient, TwitterClient
+from clients.http import call_nba_api
+from analyzers.keyword_matcher import KeywordMatcher
 from database import DatabaseManager
 from config import settings
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, JSON, insert
+from sqlalchemy.dialects.postgresql import JSONB
 from database.models import Base
+from utils.timeutils import utc_now, today_start_utc
 
 # Initialize MCP Server
 mcp = FastMCP("Heat-Fan-Server")
 
-# Initialize clients
+# NBA team ID for the Miami Heat
+HEAT_TEAM_ID = 1610612748
+
+# Initialize clients (sharing one pooled keep-alive HTTP session)
 nba_client = NBAClient()
-twitter_client = TwitterClient()
+twitter_client = TwitterClient(session=nba_client.session)
 db_manager = DatabaseManager(settings.DATABASE_URL)
 
 
@@ -32,20 +43,56 @@ class LiveGameSnapshot(Base):
     
     id = Column(Integer, primary_key=True)
     game_id = Column(String(50), nullable=False, index=True)
-    snapshot_time = Column(DateTime, default=datetime.utcnow)
+    snapshot_time = Column(DateTime, default=utc_now)
     period = Column(Integer)  # Quarter
     game_clock = Column(String(20))  # Time remaining
     heat_score = Column(Integer)
     opponent_score = Column(Integer)
-    box_score_json = Column(Text)  # Full box score as JSON
+    # Full box score (archival/debugging only) - JSONB on Postgres, JSON text elsewhere
+    box_score_json = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    last_fingerprint = Column(String(16), nullable=True)  # Hash of the player stat lines, for no-change checks
     tweet_posted = Column(Boolean, default=False)
     tweet_id = Column(String(50), nullable=True)
     tweet_text = Column(Text, nullable=True)  # Store tweet content for similarity checking
+    
+    # Hot queries filter on game_id/tweet_posted and take the newest snapshot_time,
+    # so these let the planner walk the index instead of scanning + sorting
+    __table_args__ = (
+        Index('ix_snap_game_posted_time', 'game_id', 'tweet_posted', 'snapshot_time'),
+        Index('ix_snap_posted_time', 'tweet_posted', 'snapshot_time'),
+        Index('ix_snap_boxscore_gin', 'box_score_json', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+
+class LivePlayerStatSnapshot(Base):
+    """Per-player stat line for a LiveGameSnapshot, used for diffing without parsing JSON"""
+    __tablename__ = "live_player_stat_snapshots"
+    
+    id = Column(Integer, primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey("live_game_snapshots.id", ondelete="CASCADE"), nullable=False)
+    player_name = Column(String(100), nullable=False)
+    points = Column(Integer, default=0)
+    field_goals_made = Column(Integer, default=0)
+    field_goals_attempted = Column(Integer, default=0)
+    rebounds = Column(Integer, default=0)
+    assists = Column(Integer, default=0)
+    turnovers = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index('ix_player_snap_snapshot_player', 'snapshot_id', 'player_name'),
+    )
 
 
-# Create tables
-db_manager.create_tables()
-Base.metadata.create_all(bind=db_manager.engine)
+# Stat columns diffed between snapshots, in LivePlayerStatSnapshot column order
+PLAYER_STAT_FIELDS = (
+    'points', 'field_goals_made', 'field_goals_attempted',
+    'rebounds', 'assists', 'turnovers',
+)
+
+
+def init_schema():
+    """Create tables/indexes for this server. Run once at startup, not on import."""
+    db_manager.create_tables()
 
 
 @mcp.tool()
@@ -54,26 +101,22 @@ async def get_live_heat_game() -> Dict[str, Any]:
     Check if Miami Heat have a game in progress RIGHT NOW.
     Returns game info if live, empty dict if no live game.
     """
-    from nba_api.live.nba.endpoints import scoreboard
-    
     try:
-        board = scoreboard.ScoreBoard()
+        board = await call_nba_api(_scoreboard.ScoreBoard)
         games = board.games.get_dict()
         
-        # Look for Heat game (team_id: 1610612748)
-        heat_team_id = 1610612748
-        
+        # Look for Heat game
         for game in games:
             home_team_id = game.get('homeTeam', {}).get('teamId')
             away_team_id = game.get('awayTeam', {}).get('teamId')
             game_status = game.get('gameStatus', 0)
             
             # gameStatus: 1 = scheduled, 2 = live, 3 = finished
-            is_heat_game = (home_team_id == heat_team_id or away_team_id == heat_team_id)
+            is_heat_game = (home_team_id == HEAT_TEAM_ID or away_team_id == HEAT_TEAM_ID)
             is_live = game_status == 2
             
             if is_heat_game and is_live:
-                is_home = home_team_id == heat_team_id
+                is_home = home_team_id == HEAT_TEAM_ID
                 
                 return {
                     "live": True,
@@ -110,24 +153,21 @@ async def get_heat_box_score(game_id: str) -> Dict[str, Any]:
         game_id: NBA game ID
     """
     try:
-        from nba_api.live.nba.endpoints import boxscore as live_boxscore
-        
         # Use LIVE box score API for in-progress games
         try:
-            live_box = live_boxscore.BoxScore(game_id=game_id)
+            live_box = await call_nba_api(_live_boxscore.BoxScore, game_id=game_id)
             game_data = live_box.game.get_dict()
             
-            # Extract Heat players (team_id: 1610612748)
-            heat_team_id = 1610612748
+            # Extract Heat players
             heat_players = []
             
             # Check home team
             home_team = game_data.get('homeTeam', {})
             away_team = game_data.get('awayTeam', {})
             
-            if home_team.get('teamId') == heat_team_id:
+            if home_team.get('teamId') == HEAT_TEAM_ID:
                 players = home_team.get('players', [])
-            elif away_team.get('teamId') == heat_team_id:
+            elif away_team.get('teamId') == HEAT_TEAM_ID:
                 players = away_team.get('players', [])
             else:
                 return {"error": "Heat not in this game"}
@@ -164,13 +204,12 @@ async def get_heat_box_score(game_id: str) -> Dict[str, Any]:
             # If live API fails, try traditional API (for completed games)
             logger.warning(f"Live API failed, trying traditional: {live_error}")
             
-            box_score = nba_client.get_box_score(game_id)
+            box_score = await asyncio.to_thread(nba_client.get_box_score, game_id)
             if not box_score:
                 return {"error": f"No box score found (live error: {live_error})"}
             
-            team_stats = nba_client.get_all_players_stats(game_id)
-            heat_team_id = 1610612748
-            heat_players = team_stats.get(heat_team_id, [])
+            team_stats = await asyncio.to_thread(nba_client.get_all_players_stats, game_id)
+            heat_players = team_stats.get(HEAT_TEAM_ID, [])
             
             return {
                 "game_id": game_id,
@@ -184,6 +223,187 @@ async def get_heat_box_score(game_id: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def _fingerprint(heat_stats: List[Dict]) -> str:
+    """Short hash of every player's diffed stats, used to spot polls where nothing changed."""
+    lines = repr([(p['player_name'], _stat_tuple(p)) for p in heat_stats])
+    return hashlib.blake2b(lines.encode(), digest_size=8).hexdigest()
+
+
+def _get_last_snapshot(session, game_id: str):
+    """Return (id, snapshot_time, last_fingerprint) of the newest snapshot, or None."""
+    return (
+        session.query(
+            LiveGameSnapshot.id,
+            LiveGameSnapshot.snapshot_time,
+            LiveGameSnapshot.last_fingerprint,
+        )
+        .filter(LiveGameSnapshot.game_id == game_id)
+        .order_by(LiveGameSnapshot.snapshot_time.desc())
+        .first()
+    )
+
+
+def _stat_tuple(player: Dict) -> tuple:
+    """Pull PLAYER_STAT_FIELDS out of a player stat dict as a tuple of ints."""
+    get = player.get
+    return tuple([get(f, 0) for f in PLAYER_STAT_FIELDS])
+
+
+def _get_snapshot_player_stats(session, last_snapshot) -> Dict[str, tuple]:
+    """Map player_name -> PLAYER_STAT_FIELDS tuple for a snapshot."""
+    rows = (
+        session.query(
+            LivePlayerStatSnapshot.player_name,
+            *(getattr(LivePlayerStatSnapshot, f) for f in PLAYER_STAT_FIELDS),
+        )
+        .filter(LivePlayerStatSnapshot.snapshot_id == last_snapshot.id)
+        .all()
+    )
+    if rows:
+        return {row[0]: tuple(row[1:]) for row in rows}
+    
+    # Snapshots saved before the player stat table existed only have the JSON blob
+    box_score = (
+        session.query(LiveGameSnapshot.box_score_json)
+        .filter(LiveGameSnapshot.id == last_snapshot.id)
+        .scalar()
+    )
+    return {p['player_name']: _stat_tuple(p) for p in box_score or []}
+
+
+def _diff_box_scores(
+    session,
+    last_snapshot,
+    current_stats: List[Dict],
+    now: datetime,
+    fingerprint: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the compare_box_scores() result from the previous snapshot row."""
+    if not last_snapshot:
+        return {
+            "first_check": True,
+            "message": "No previous snapshot - this is the first check",
+            "changes": []
+        }
+    
+    # Same box score as last time - nothing to diff
+    if fingerprint is None:
+        fingerprint = _fingerprint(current_stats)
+    if fingerprint == last_snapshot.last_fingerprint:
+        return {
+            "first_check": False,
+            "minutes_since_last": (now - last_snapshot.snapshot_time).seconds // 60,
+            "changes": [],
+            "heat_score_change": None,
+        }
+    
+    old_stats_by_player = _get_snapshot_player_stats(session, last_snapshot)
+    
+    # Compare each player
+    changes = []
+    for current_player in current_stats:
+        name = current_player['player_name']
+        old_player = old_stats_by_player.get(name)
+        
+        if not old_player:
+            # New player entered the game
+            changes.append({
+                "player": name,
+                "event": "entered_game",
+                "current_stats": current_player
+            })
+            continue
+        
+        # Check for changes in key stats
+        current = _stat_tuple(current_player)
+        if current == old_player:
+            continue
+        
+        pts_diff, fgm_diff, fga_diff, reb_diff, ast_diff, to_diff = map(sub, current, old_player)
+        changes.append({
+            "player": name,
+            "points_change": pts_diff,
+            "fgm_change": fgm_diff,
+            "fga_change": fga_diff,
+            "rebounds_change": reb_diff,
+            "assists_change": ast_diff,
+            "turnovers_change": to_diff,
+            "missed_shots": fga_diff - fgm_diff,  # Important for roasting!
+            "current_points": current[0],
+            "current_rebounds": current[3],
+            "current_assists": current[4],
+        })
+    
+    return {
+        "first_check": False,
+        "minutes_since_last": (now - last_snapshot.snapshot_time).seconds // 60,
+        "changes": changes,
+        "heat_score_change": None,  # Will add if needed
+    }
+
+
+def _insert_snapshot(
+    session,
+    game_id: str,
+    period: int,
+    game_clock: str,
+    heat_score: int,
+    opponent_score: int,
+    heat_stats: List[Dict],
+    now: datetime,
+    fingerprint: Optional[str] = None
+) -> int:
+    """
+    Insert a snapshot row with a single Core INSERT ... RETURNING (no ORM unit-of-work),
+    plus one executemany for its player stat rows.
+    """
+    if fingerprint is None:
+        fingerprint = _fingerprint(heat_stats)
+    
+    stmt = (
+        insert(LiveGameSnapshot)
+        .values(
+            game_id=game_id,
+            snapshot_time=now,
+            period=period,
+            game_clock=game_clock,
+            heat_score=heat_score,
+            opponent_score=opponent_score,
+            box_score_json=heat_stats,
+            last_fingerprint=fingerprint,
+            tweet_posted=False
+        )
+        .returning(LiveGameSnapshot.id)
+    )
+    snapshot_id = session.execute(stmt).scalar_one()
+    
+    if heat_stats:
+        session.execute(
+            insert(LivePlayerStatSnapshot),
+            [
+                {
+                    "snapshot_id": snapshot_id,
+                    "player_name": p['player_name'],
+                    **{f: p.get(f, 0) for f in PLAYER_STAT_FIELDS},
+                }
+                for p in heat_stats
+            ]
+        )
+    return snapshot_id
+
+
+def _compare_box_scores(game_id: str, current_stats: List[Dict]) -> Dict[str, Any]:
+    """Blocking part of compare_box_scores(), run in a worker thread."""
+    try:
+        with db_manager.session_scope() as session:
+            last_snapshot = _get_last_snapshot(session, game_id)
+            return _diff_box_scores(session, last_snapshot, current_stats, utc_now())
+            
+    except Exception as e:
+        logger.error(f"Error comparing box scores: {e}")
+        return {"error": str(e)}
+
+
 @mcp.tool()
 async def compare_box_scores(game_id: str, current_stats: List[Dict]) -> Dict[str, Any]:
     """
@@ -194,82 +414,44 @@ async def compare_box_scores(game_id: str, current_stats: List[Dict]) -> Dict[st
         game_id: NBA game ID
         current_stats: Current Heat player stats
     """
-    session = db_manager.get_session()
-    
+    return await asyncio.to_thread(_compare_box_scores, game_id, current_stats)
+
+
+def _save_snapshot_and_diff(
+    game_id: str,
+    period: int,
+    game_clock: str,
+    heat_score: int,
+    opponent_score: int,
+    heat_stats: List[Dict]
+) -> Dict[str, Any]:
+    """Blocking part of save_snapshot_and_diff(), run in a worker thread."""
     try:
-        # Get most recent snapshot
-        last_snapshot = (
-            session.query(LiveGameSnapshot)
-            .filter_by(game_id=game_id)
-            .order_by(LiveGameSnapshot.snapshot_time.desc())
-            .first()
-        )
-        
-        if not last_snapshot:
-            return {
-                "first_check": True,
-                "message": "No previous snapshot - this is the first check",
-                "changes": []
-            }
-        
-        # Parse old stats
-        old_box_score = json.loads(last_snapshot.box_score_json)
-        old_stats_by_player = {p['player_name']: p for p in old_box_score}
-        
-        # Compare each player
-        changes = []
-        for current_player in current_stats:
-            name = current_player['player_name']
-            old_player = old_stats_by_player.get(name)
+        with db_manager.session_scope() as session:
+            now = utc_now()
+            last_snapshot = _get_last_snapshot(session, game_id)
+            fingerprint = _fingerprint(heat_stats)
+            result = _diff_box_scores(session, last_snapshot, heat_stats, now, fingerprint)
             
-            if not old_player:
-                # New player entered the game
-                changes.append({
-                    "player": name,
-                    "event": "entered_game",
-                    "current_stats": current_player
-                })
-                continue
+            snapshot_id = _insert_snapshot(
+                session, game_id, period, game_clock,
+                heat_score, opponent_score, heat_stats, now, fingerprint
+            )
             
-            # Check for changes in key stats
-            pts_diff = current_player['points'] - old_player['points']
-            fgm_diff = current_player.get('field_goals_made', 0) - old_player.get('field_goals_made', 0)
-            fga_diff = current_player.get('field_goals_attempted', 0) - old_player.get('field_goals_attempted', 0)
-            reb_diff = current_player['rebounds'] - old_player['rebounds']
-            ast_diff = current_player['assists'] - old_player['assists']
-            to_diff = current_player['turnovers'] - old_player['turnovers'] 
+            result.update({
+                "success": True,
+                "snapshot_id": snapshot_id,
+                "saved_at": str(now)
+            })
+            return result
             
-            if any([pts_diff, fgm_diff, fga_diff, reb_diff, ast_diff, to_diff]):
-                changes.append({
-                    "player": name,
-                    "points_change": pts_diff,
-                    "fgm_change": fgm_diff,
-                    "fga_change": fga_diff,
-                    "rebounds_change": reb_diff,
-                    "assists_change": ast_diff,
-                    "turnovers_change": to_diff,
-                    "missed_shots": fga_diff - fgm_diff,  # Important for roasting!
-                    "current_points": current_player['points'],
-                    "current_rebounds": current_player['rebounds'],
-                    "current_assists": current_player['assists'],
-                })
-        
-        return {
-            "first_check": False,
-            "minutes_since_last": (datetime.utcnow() - last_snapshot.snapshot_time).seconds // 60,
-            "changes": changes,
-            "heat_score_change": None,  # Will add if needed
-        }
-        
     except Exception as e:
-        logger.error(f"Error comparing box scores: {e}")
+        logger.error(f"Error saving snapshot and diff: {e}")
         return {"error": str(e)}
-    finally:
-        session.close()
 
 
 @mcp.tool()
-async def save_snapshot(
+async def save_snapshot_and_diff(
     game_id: str,
     period: int,
     game_clock: str,
@@ -278,7 +460,9 @@ async def save_snapshot(
     heat_stats: List[Dict]
 ) -> Dict[str, Any]:
     """
-    Save current game state for future comparison.
+    Compare current box score to the last snapshot AND save the new snapshot.
+    Does both in one transaction - use this instead of calling
+    compare_box_scores() and save_snapshot() back-to-back.
     
     Args:
         game_id: NBA game ID
@@ -287,36 +471,105 @@ async def save_snapshot(
         heat_score: Heat's current score
         opponent_score: Opponent's score
         heat_stats: List of Heat player stats
-    """
-    session = db_manager.get_session()
     
+    Returns the compare_box_scores() result plus snapshot_id and saved_at.
+    """
+    return await asyncio.to_thread(
+        _save_snapshot_and_diff, game_id, period, game_clock, heat_score, opponent_score, heat_stats
+    )
+
+
+def _save_snapshot(
+    game_id: str,
+    period: int,
+    game_clock: str,
+    heat_score: int,
+    opponent_score: int,
+    heat_stats: List[Dict]
+) -> Dict[str, Any]:
+    """Blocking part of save_snapshot(), run in a worker thread."""
     try:
-        snapshot = LiveGameSnapshot(
-            game_id=game_id,
-            snapshot_time=datetime.utcnow(),
-            period=period,
-            game_clock=game_clock,
-            heat_score=heat_score,
-            opponent_score=opponent_score,
-            box_score_json=json.dumps(heat_stats),
-            tweet_posted=False
-        )
-        
-        session.add(snapshot)
-        session.commit()
-        
-        return {
-            "success": True,
-            "snapshot_id": snapshot.id,
-            "saved_at": str(snapshot.snapshot_time)
-        }
-        
+        with db_manager.session_scope() as session:
+            now = utc_now()
+            snapshot_id = _insert_snapshot(
+                session, game_id, period, game_clock,
+                heat_score, opponent_score, heat_stats, now
+            )
+            
+            return {
+                "success": True,
+                "snapshot_id": snapshot_id,
+                "saved_at": str(now)
+            }
+            
     except Exception as e:
-        session.rollback()
         logger.error(f"Error saving snapshot: {e}")
         return {"error": str(e)}
-    finally:
-        session.close()
+
+
+@mcp.tool()
+async def save_snapshot(
+    game_id: str,
+    period: int,
+    game_clock: str,
+    heat_score: int,
+    opponent_score: int,
+    heat_stats: List[Dict]
+) -> Dict[str, Any]:
+    """
+    Save current game state for future comparison.
+    Prefer save_snapshot_and_diff() when you also need the comparison.
+    
+    Args:
+        game_id: NBA game ID
+        period: Current quarter
+        game_clock: Time remaining
+        heat_score: Heat's current score
+        opponent_score: Opponent's score
+        heat_stats: List of Heat player stats
+    """
+    return await asyncio.to_thread(
+        _save_snapshot, game_id, period, game_clock, heat_score, opponent_score, heat_stats
+    )
+
+
+# Key phrases checked by calculate_tweet_similarity()
+SIMILARITY_KEYWORDS = (
+    'BRICK', 'PERFECT', 'TRADE', 'BENCH', 'FIRE', 'HOT', 'COLD',
+    'MISS', 'MAKE', '0 PTS', '0 REBS', 'GOAT', 'TRASH', 'CLOWN',
+    'FROM 3', 'FROM THREE', 'SHOOTING', 'POINTS', 'REBOUNDS',
+    'HALFTIME', 'QUARTER', 'SHAMBLES', 'MAX PLAYER', 'MAX MY ASS',
+    'LITERALLY', 'IS HIM',
+)
+
+# Common Heat player last names and nicknames
+SIMILARITY_PLAYERS = (
+    'BAM', 'ADEBAYO', 'ADE-BRICK', 'JIMMY', 'BUTLER', 'TYLER', 'HERRO',
+    'HER-NO', 'NORMAN', 'POWELL', 'NORM', 'JOVIC', 'HIGHSMITH', 'ROBINSON',
+    'ROZIER', 'MARTIN', 'WARE', 'NIKOLA',
+)
+
+# Famous player comparisons (high similarity if same comparison)
+SIMILARITY_COMPARISONS = (
+    'KLAY THOMPSON', 'STEPH CURRY', 'MICHAEL JORDAN', 'LEBRON',
+    'PRIME WADE', 'SHAQ', 'KAREEM', 'MAGIC',
+)
+
+# Stat patterns (e.g., "5/6 FROM THREE", "20 PTS")
+SIMILARITY_STAT_PATTERNS = tuple(re.compile(p) for p in (
+    r'\d+/\d+\s*FROM\s*(THREE|3)',  # X/Y from three
+    r'\d+\s*PTS',                    # X PTS
+    r'\d+\s*REBS',                   # X REBS
+    r'\d+\s*ASSISTS',                # X ASSISTS
+    r'\d+-\d+',                      # X-Y record
+))
+
+_SIMILARITY_TERM_GROUPS = {
+    **{term: "keyword" for term in SIMILARITY_KEYWORDS},
+    **{term: "player" for term in SIMILARITY_PLAYERS},
+    **{term: "comparison" for term in SIMILARITY_COMPARISONS},
+}
+_SIMILARITY_MATCHER = KeywordMatcher(_SIMILARITY_TERM_GROUPS)
 
 
 def calculate_tweet_similarity(tweet1: str, tweet2: str) -> float:
@@ -328,58 +581,30 @@ def calculate_tweet_similarity(tweet1: str, tweet2: str) -> float:
     t1 = tweet1.upper()
     t2 = tweet2.upper()
     
-    # Extract key phrases and player names
-    keywords = ['BRICK', 'PERFECT', 'TRADE', 'BENCH', 'FIRE', 'HOT', 'COLD', 
-                'MISS', 'MAKE', '0 PTS', '0 REBS', 'GOAT', 'TRASH', 'CLOWN',
-                'FROM 3', 'FROM THREE', 'SHOOTING', 'POINTS', 'REBOUNDS', 
-                'HALFTIME', 'QUARTER', 'SHAMBLES', 'MAX PLAYER', 'MAX MY ASS',
-                'LITERALLY', 'IS HIM']
-    
-    # Common Heat player last names and nicknames
-    players = ['BAM', 'ADEBAYO', 'ADE-BRICK', 'JIMMY', 'BUTLER', 'TYLER', 'HERRO', 
-               'HER-NO', 'NORMAN', 'POWELL', 'NORM', 'JOVIC', 'HIGHSMITH', 'ROBINSON', 
-               'ROZIER', 'MARTIN', 'WARE', 'NIKOLA']
-    
-    # Famous player comparisons (high similarity if same comparison)
-    comparisons = ['KLAY THOMPSON', 'STEPH CURRY', 'MICHAEL JORDAN', 'LEBRON', 
-                   'PRIME WADE', 'SHAQ', 'KAREEM', 'MAGIC']
-    
-    # Check for stat patterns (e.g., "5/6 FROM THREE", "20 PTS")
-    import re
-    stat_patterns = [
-        r'\d+/\d+\s*FROM\s*(THREE|3)',  # X/Y from three
-        r'\d+\s*PTS',                    # X PTS
-        r'\d+\s*REBS',                   # X REBS
-        r'\d+\s*ASSISTS',                # X ASSISTS
-        r'\d+-\d+',                      # X-Y record
-    ]
+    # One pass per tweet finds keywords, player names and comparisons together
+    t1_terms = _SIMILARITY_MATCHER.find_by_group(t1, _SIMILARITY_TERM_GROUPS)
+    t2_terms = _SIMILARITY_MATCHER.find_by_group(t2, _SIMILARITY_TERM_GROUPS)
     
     t1_stats = []
     t2_stats = []
-    for pattern in stat_patterns:
-        t1_stats.extend(re.findall(pattern, t1))
-        t2_stats.extend(re.findall(pattern, t2))
+    for pattern in SIMILARITY_STAT_PATTERNS:
+        t1_stats.extend(pattern.findall(t1))
+        t2_stats.extend(pattern.findall(t2))
     
     # Count overlapping stats
     stat_overlap = len(set(t1_stats) & set(t2_stats))
     stat_total = len(set(t1_stats) | set(t2_stats))
     
     # Count overlapping keywords
-    t1_keywords = [k for k in keywords if k in t1]
-    t2_keywords = [k for k in keywords if k in t2]
-    keyword_overlap = len(set(t1_keywords) & set(t2_keywords))
-    keyword_total = len(set(t1_keywords) | set(t2_keywords))
+    keyword_overlap = len(t1_terms["keyword"] & t2_terms["keyword"])
+    keyword_total = len(t1_terms["keyword"] | t2_terms["keyword"])
     
     # Count overlapping player names
-    t1_players = [p for p in players if p in t1]
-    t2_players = [p for p in players if p in t2]
-    player_overlap = len(set(t1_players) & set(t2_players))
-    player_total = len(set(t1_players) | set(t2_players))
+    player_overlap = len(t1_terms["player"] & t2_terms["player"])
+    player_total = len(t1_terms["player"] | t2_terms["player"])
     
     # Check for same comparison
-    t1_comparisons = [c for c in comparisons if c in t1]
-    t2_comparisons = [c for c in comparisons if c in t2]
-    comparison_match = len(set(t1_comparisons) & set(t2_comparisons)) > 0
+    comparison_match = len(t1_terms["comparison"] & t2_terms["comparison"]) > 0
     
     # Calculate similarity score
     if keyword_total == 0 and player_total == 0:
@@ -408,112 +633,155 @@ def calculate_tweet_similarity(tweet1: str, tweet2: str) -> float:
     return similarity
 
 
-@mcp.tool()
-async def post_heat_tweet(tweet_text: str, game_id: str, snapshot_id: int) -> Dict[str, Any]:
+class _DailyTweetIndex:
     """
-    Post a controversial Heat fan tweet.
-    Checks for similarity with recent tweets to avoid repetition.
+    Today's posted tweets, indexed by the similarity terms they contain.
     
-    Args:
-        tweet_text: The spicy take to post
-        game_id: NBA game ID
-        snapshot_id: Database snapshot ID
+    calculate_tweet_similarity() can only exceed the posting threshold when two
+    tweets share a keyword, player name or comparison, so only tweets sharing
+    one of those terms need the full similarity check. Seeded from the
+    database on first use each UTC day and kept up to date as tweets post.
     """
-    session = db_manager.get_session()
     
-    try:
-        from datetime import timedelta
-        
-        # Check for similar tweets posted today
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        todays_tweets = (
-            session.query(LiveGameSnapshot)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day_start: Optional[datetime] = None
+        self._texts: List[str] = []
+        self._by_term: Dict[str, List[int]] = {}
+    
+    def _add_locked(self, tweet_text: str):
+        idx = len(self._texts)
+        self._texts.append(tweet_text)
+        for term in _SIMILARITY_MATCHER.find(tweet_text.upper()):
+            self._by_term.setdefault(term, []).append(idx)
+    
+    def _refresh_locked(self, session):
+        today_start = today_start_utc()
+        if self._day_start == today_start:
+            return
+        
+        self._day_start = today_start
+        self._texts = []
+        self._by_term = {}
+        
+        # Only the tweet text is needed - stream it instead of loading whole snapshots
+        rows = (
+            session.query(LiveGameSnapshot.tweet_text)
             .filter(
-                LiveGameSnapshot.tweet_posted == True,
-                LiveGameSnapshot.snapshot_time >= today_start
+                LiveGameSnapshot.tweet_posted.is_(True),
+                LiveGameSnapshot.snapshot_time >= today_start,
+                LiveGameSnapshot.tweet_text.isnot(None)
             )
-            .all()
+            .yield_per(200)
         )
-        
-        # Check similarity with each tweet from today
-        for old_snapshot in todays_tweets:
-            if not old_snapshot.tweet_text:
-                continue
+        for (old_text,) in rows:
+            self._add_locked(old_text)
+    
+    def candidates(self, session, tweet_text: str) -> List[str]:
+        """Tweets posted today that share at least one similarity term with tweet_text."""
+        with self._lock:
+            self._refresh_locked(session)
+            
+            matches = set()
+            for term in _SIMILARITY_MATCHER.find(tweet_text.upper()):
+                matches.update(self._by_term.get(term, ()))
+            return [self._texts[i] for i in sorted(matches)]
+    
+    def add(self, tweet_text: str):
+        """Record a newly posted tweet."""
+        with self._lock:
+            if self._day_start == today_start_utc():
+                self._add_locked(tweet_text)
+
+
+_todays_tweets = _DailyTweetIndex()
+
+
+def _post_heat_tweet(tweet_text: str, game_id: str, snapshot_id: int) -> Dict[str, Any]:
+    """Blocking part of post_heat_tweet(), run in a worker thread."""
+    try:
+        with db_manager.session_scope() as session:
+            # Check for similar tweets posted today (only ones sharing a term can match)
+            for old_text in _todays_tweets.candidates(session, tweet_text):
+                similarity = calculate_tweet_similarity(tweet_text, old_text)
+                
+                # If similarity is too high (> 45%), reject the tweet
+                if similarity > 0.45:
+                    logger.warning(f"Tweet too similar ({similarity:.2f}) to earlier tweet: {old_text[:50]}...")
+                    return {
+                        "success": False,
+                        "error": f"Tweet too similar to earlier tweet today (similarity: {similarity:.2f})",
+                        "similar_to": old_text,
+                        "similarity_score": similarity,
+                        "blocked": True
+                    }
             
-            similarity = calculate_tweet_similarity(tweet_text, old_snapshot.tweet_text)
+            # Post to Twitter
+            tweet_id = twitter_client.post_tweet(tweet_text)
             
-            # If similarity is too high (> 45%), reject the tweet
-            if similarity > 0.45:
-                logger.warning(f"Tweet too similar ({similarity:.2f}) to earlier tweet: {old_snapshot.tweet_text[:50]}...")
+            if not tweet_id:
                 return {
                     "success": False,
-                    "error": f"Tweet too similar to earlier tweet today (similarity: {similarity:.2f})",
-                    "similar_to": old_snapshot.tweet_text,
-                    "similarity_score": similarity,
-                    "blocked": True
+                    "error": "Failed to post tweet"
                 }
+            
+            # Mark snapshot as tweeted AND store tweet text
+            snapshot = session.get(LiveGameSnapshot, snapshot_id)
+            if snapshot:
+                snapshot.tweet_posted = True
+                snapshot.tweet_id = tweet_id
+                snapshot.tweet_text = tweet_text  # Store for future similarity checks
         
-        # Post to Twitter
-        tweet_id = twitter_client.post_tweet(tweet_text)
-        
-        if not tweet_id:
-            return {
-                "success": False,
-                "error": "Failed to post tweet"
-            }
-        
-        # Mark snapshot as tweeted AND store tweet text
-        snapshot = session.query(LiveGameSnapshot).filter_by(id=snapshot_id).first()
-        if snapshot:
-            snapshot.tweet_posted = True
-            snapshot.tweet_id = tweet_id
-            snapshot.tweet_text = tweet_text  # Store for future similarity checks
-            session.commit()
+        # Only index the tweet once its snapshot update has committed
+        _todays_tweets.add(tweet_text)
         
         return {
             "success": True,
             "tweet_id": tweet_id,
             "tweet_text": tweet_text
         }
-        
+            
     except Exception as e:
-        session.rollback()
         logger.error(f"Error posting tweet: {e}")
         return {"error": str(e)}
-    finally:
-        session.close()
 
 
 @mcp.tool()
-async def check_recent_heat_tweets(game_id: str, minutes: int = 5) -> Dict[str, Any]:
+async def post_heat_tweet(tweet_text: str, game_id: str, snapshot_id: int) -> Dict[str, Any]:
     """
-    Check if we've tweeted about this game recently.
-    Prevents spam.
+    Post a controversial Heat fan tweet.
+    Checks for similarity with recent tweets to avoid repetition.
     
     Args:
+        tweet_text: The spicy take to post
         game_id: NBA game ID
-        minutes: Don't tweet if we posted within this many minutes
+        snapshot_id: Database snapshot ID
     """
-    session = db_manager.get_session()
-    
-    try:
-        from datetime import timedelta
-        
-        cutoff_time = datetime.utcnow() - timedelta(minutes=minutes)
+    return await asyncio.to_thread(_post_heat_tweet, tweet_text, game_id, snapshot_id)
+
+
+def _check_recent_heat_tweets(game_id: str, minutes: int = 5) -> Dict[str, Any]:
+    """Blocking part of check_recent_heat_tweets(), run in a worker thread."""
+    with db_manager.session_scope() as session:
+        cutoff_time = utc_now() - timedelta(minutes=minutes)
         
+        # Just the two fields we report - one index probe, no ORM object
         recent_tweet = (
-            session.query(LiveGameSnapshot)
-            .filter_by(game_id=game_id, tweet_posted=True)
-            .filter(LiveGameSnapshot.snapshot_time >= cutoff_time)
+            session.query(LiveGameSnapshot.tweet_id, LiveGameSnapshot.snapshot_time)
+            .filter(
+                LiveGameSnapshot.game_id == game_id,
+                LiveGameSnapshot.tweet_posted.is_(True),
+                LiveGameSnapshot.snapshot_time >= cutoff_time
+            )
             .order_by(LiveGameSnapshot.snapshot_time.desc())
+            .limit(1)
             .first()
         )
         
         if recent_tweet:
             return {
                 "recently_tweeted": True,
-                "minutes_ago": (datetime.utcnow() - recent_tweet.snapshot_time).seconds // 60,
+                "minutes_ago": (utc_now() - recent_tweet.snapshot_time).seconds // 60,
                 "tweet_id": recent_tweet.tweet_id
             }
         
@@ -521,9 +789,19 @@ async def check_recent_heat_tweets(game_id: str, minutes: int = 5) -> Dict[str,
             "recently_tweeted": False,
             "message": "Clear to tweet"
         }
-        
-    finally:
-        session.close()
+
+
+@mcp.tool()
+async def check_recent_heat_tweets(game_id: str, minutes: int = 5) -> Dict[str, Any]:
+    """
+    Check if we've tweeted about this game recently.
+    Prevents spam.
+    
+    Args:
+        game_id: NBA game ID
+        minutes: Don't tweet if we posted within this many minutes
+    """
+    return await asyncio.to_thread(_check_recent_heat_tweets, game_id, minutes)
 
 
 @mcp.tool()
@@ -624,5 +902,6 @@ Write a random, spicy shitpost about the Miami Heat RIGHT NOW:"""
 
 
 if __name__ == "__main__":
+    init_schema()
     mcp.run()
 
@@ -4,18 +4,26 @@ NBA Agent - Main application entry point.
 
 This agent monitors NBA news tweets and posts box scores automatically.
 """
+import os
 import sys
-import time
 import signal
+from functools import cache
 from loguru import logger
 
-from config import settings
+from config import settings, RuntimeConfig
 from utils import setup_logging
 from database import DatabaseManager
-from clients import TwitterClient, NBAClient
-from analyzers import InjuryDetector
-from agents import TweetMonitorAgent, BoxScoreAgent
 from scheduler import JobScheduler
+from scheduler.job_scheduler import MAX_WORKERS
+
+# Separator line used around startup/shutdown log sections
+_BANNER = "=" * 60
+
+
+@cache
+def _validated_settings() -> bool:
+    """Validate settings once per process; a failure is not cached."""
+    return settings.validate()
 
 
 class NBAAgent:
@@ -23,78 +31,80 @@ class NBAAgent:
     
     def __init__(self):
         """Initialize the NBA Agent."""
-        self.running = False
         self.scheduler = None
+        self.nba_client = None
         
     def setup(self):
         """Set up all components."""
-        logger.info("=" * 60)
-        logger.info("NBA Agent Starting Up")
-        logger.info("=" * 60)
+        # Collect the startup report and log it once setup finishes
+        report = [_BANNER, "NBA Agent Starting Up", _BANNER]
         
         # Validate configuration
-        logger.info("Validating configuration...")
-        settings.validate()
-        logger.info("✓ Configuration valid")
+        _validated_settings()
+        self.config = RuntimeConfig.from_settings(settings)
+        report.append("✓ Configuration valid")
         
         # Initialize database
-        logger.info("Initializing database...")
-        self.db_manager = DatabaseManager(settings.DATABASE_URL)
+        # Only the scheduler's worker threads touch the database
+        self.db_manager = DatabaseManager(self.config.database_url, pool_size=MAX_WORKERS)
         self.db_manager.create_tables()
-        logger.info("✓ Database initialized")
+        report.append("✓ Database initialized")
         
-        # Initialize clients
-        logger.info("Initializing API clients...")
-        self.twitter_client = TwitterClient()
-        self.nba_client = NBAClient()
-        logger.info("✓ API clients initialized")
+        # Initialize clients (the NBA client is only needed for box scores)
+        from clients import TwitterClient
+        from clients.http import build_session
+        self.http_session = build_session()
+        self.twitter_client = TwitterClient(session=self.http_session)
+        report.append("✓ API clients initialized")
         
         # Initialize agents based on enabled features
-        logger.info("Initializing agents...")
         self.tweet_monitor = None
         self.box_score_agent = None
         
-        if settings.ENABLE_TWEET_MONITORING:
-            logger.info("  - Tweet monitoring is ENABLED")
+        if self.config.enable_tweet_monitoring:
+            report.append("  - Tweet monitoring is ENABLED")
             from analyzers import InjuryDetector
+            from agents import TweetMonitorAgent
             self.injury_detector = InjuryDetector()
             self.tweet_monitor = TweetMonitorAgent(
                 twitter_client=self.twitter_client,
                 injury_detector=self.injury_detector,
                 db_manager=self.db_manager,
-                target_username=settings.SHAMS_TWITTER_USERNAME
+                target_username=self.config.target_username
             )
         else:
-            logger.info("  - Tweet monitoring is DISABLED (set ENABLE_TWEET_MONITORING=true to enable)")
+            report.append("  - Tweet monitoring is DISABLED (set ENABLE_TWEET_MONITORING=true to enable)")
         
-        if settings.ENABLE_BOX_SCORE_POSTING:
-            logger.info("  - Box score posting is ENABLED")
+        if self.config.enable_box_score_posting:
+            report.append("  - Box score posting is ENABLED")
+            from clients import NBAClient
+            from agents import BoxScoreAgent
+            self.nba_client = NBAClient(session=self.http_session)
+            self.nba_client.on_repeated_timeouts = self.reset_sessions
             self.box_score_agent = BoxScoreAgent(
                 twitter_client=self.twitter_client,
                 nba_client=self.nba_client,
                 db_manager=self.db_manager
             )
         else:
-            logger.info("  - Box score posting is DISABLED")
+            report.append("  - Box score posting is DISABLED")
         
         if not self.tweet_monitor and not self.box_score_agent:
             raise ValueError("At least one feature must be enabled (tweet monitoring or box score posting)")
         
-        logger.info("✓ Agents initialized")
+        report.append("✓ Agents initialized")
         
         # Initialize scheduler
-        logger.info("Initializing scheduler...")
         self.scheduler = JobScheduler(
             tweet_monitor=self.tweet_monitor,
             box_score_agent=self.box_score_agent,
-            tweet_check_interval_minutes=settings.TWEET_CHECK_INTERVAL,
-            box_score_post_interval_minutes=settings.BOX_SCORE_POST_INTERVAL
+            tweet_check_interval_minutes=self.config.tweet_check_interval,
+            box_score_post_interval_minutes=self.config.box_score_post_interval
         )
-        logger.info("✓ Scheduler initialized")
+        report.append("✓ Scheduler initialized")
         
-        logger.info("=" * 60)
-        logger.info("NBA Agent Setup Complete")
-        logger.info("=" * 60)
+        report += [_BANNER, "NBA Agent Setup Complete", _BANNER]
+        logger.info("\n" + "\n".join(report))
     
     def start(self):
         """Start the NBA Agent."""
@@ -105,22 +115,20 @@ class NBAAgent:
             signal.signal(signal.SIGINT, self._signal_handler)
             signal.signal(signal.SIGTERM, self._signal_handler)
             
-            # Start the scheduler
-            self.scheduler.start()
-            self.running = True
+            banner = ["NBA Agent is now running!"]
+            if self.config.enable_tweet_monitoring:
+                banner.append("Monitoring: @" + self.config.target_username)
+                banner.append("Tweet checks: every {} minutes".format(self.config.tweet_check_interval))
+            if self.config.enable_box_score_posting:
+                banner.append("Box score posts: every {} minutes".format(self.config.box_score_post_interval))
+            banner += ["Press Ctrl+C to stop", _BANNER]
+            logger.info("\n".join(banner))
             
-            logger.info("NBA Agent is now running!")
-            if settings.ENABLE_TWEET_MONITORING:
-                logger.info("Monitoring: @" + settings.SHAMS_TWITTER_USERNAME)
-                logger.info("Tweet checks: every {} minutes".format(settings.TWEET_CHECK_INTERVAL))
-            if settings.ENABLE_BOX_SCORE_POSTING:
-                logger.info("Box score posts: every {} minutes".format(settings.BOX_SCORE_POST_INTERVAL))
-            logger.info("Press Ctrl+C to stop")
-            logger.info("=" * 60)
+            self._apply_cpu_pinning()
             
-            # Keep the main thread alive
-            while self.running:
-                time.sleep(1)
+            # The scheduler runs on the main thread until a signal stops it
+            self.scheduler.start()
+            self.stop()
                 
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
@@ -132,23 +140,58 @@ class NBAAgent:
     
     def stop(self):
         """Stop the NBA Agent."""
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         logger.info("NBA Agent Shutting Down")
-        logger.info("=" * 60)
-        
-        self.running = False
+        logger.info(_BANNER)
         
-        if self.scheduler:
+        if self.scheduler and self.scheduler.running:
             self.scheduler.stop()
         
+        if self.nba_client:
+            self.nba_client.clear_cache()
+        
         logger.info("NBA Agent stopped successfully")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
+        
+        # Drain the queued log records before the process exits
+        logger.complete()
+    
+    def _apply_cpu_pinning(self):
+        """Pin the process to PIN_CPU and drop its priority, if configured."""
+        cpu = self.config.pin_cpu
+        if cpu is None:
+            return
+        if not hasattr(os, "sched_setaffinity"):
+            logger.warning("PIN_CPU is set but CPU affinity is not supported on this platform")
+            return
+        
+        try:
+            os.sched_setaffinity(0, {cpu})
+            os.nice(5)  # background daemon - yield to interactive work
+            logger.info(f"Pinned to CPU {cpu}")
+        except OSError as e:
+            logger.warning(f"Could not pin to CPU {cpu}: {e}")
+    
+    def reset_sessions(self):
+        """Close the shared HTTP session and hand a fresh one to every client."""
+        logger.info("Resetting shared HTTP session")
+        
+        try:
+            self.http_session.close()
+        except Exception as e:
+            logger.debug(f"Error closing HTTP session: {e}")
+        
+        from clients.http import build_session
+        self.http_session = build_session()
+        self.twitter_client.use_session(self.http_session)
+        if self.nba_client:
+            self.nba_client.use_session(self.http_session)
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals."""
         logger.info(f"Received signal {signum}")
-        self.stop()
-        sys.exit(0)
+        if self.scheduler:
+            self.scheduler.stop()
 
 
 def main():
@@ -2,29 +2,133 @@
 """
 MCP Client - For testing your MCP server locally.
 This is NOT the AI agent - it's just for debugging.
+
+By default each run spawns a fresh `mcp_server.py` over stdio. Pass --sse to
+reuse a background `mcp_server.py --sse` process instead (starting one on
+first run), so repeated runs skip the server's cold start. That server keeps
+running the code it started with: pass --restart after editing the server,
+or --stop to shut it down.
 """
 import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
 from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
 
+try:
+    import uvloop
+except ImportError:  # optional - falls back to the default asyncio loop
+    uvloop = None
 
-async def main():
-    """Test MCP server by calling its tools."""
-    print("=" * 60)
-    print("MCP CLIENT TEST - Connecting to MCP Server")
-    print("=" * 60)
+# FastMCP's default SSE host/port
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_URL = f"http://{SERVER_HOST}:{SERVER_PORT}/sse"
+SERVER_STARTUP_TIMEOUT = 30
+# Name mcp_server.py registers with FastMCP, checked in the initialize handshake
+SERVER_NAME = "NBA-Agent-Server"
+# Where the background server's PID and output go
+SERVER_PID_FILE = Path("logs/mcp_server_sse.pid")
+SERVER_LOG_FILE = Path("logs/mcp_server_sse.log")
+
+
+def _server_is_up() -> bool:
+    """Check whether something is listening on the dev server port."""
+    try:
+        with socket.create_connection((SERVER_HOST, SERVER_PORT), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def stop_server() -> bool:
+    """Stop the background server a previous run started; return whether one was stopped."""
+    try:
+        pid = int(SERVER_PID_FILE.read_text())
+    except (OSError, ValueError):
+        return False
+    SERVER_PID_FILE.unlink(missing_ok=True)
     
-    # Connect to your MCP server
+    # A stale PID file (server already gone) leaves nothing to stop
+    if not _server_is_up():
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        return False
+    
+    deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+    while _server_is_up() and time.monotonic() < deadline:
+        time.sleep(0.2)
+    print(f"🛑 Stopped MCP server (pid {pid})")
+    return True
+
+
+async def get_or_spawn_server() -> str:
+    """Return the URL of the dev MCP server, starting a detached one if needed."""
+    if _server_is_up():
+        # Whoever holds the port is checked in the initialize handshake
+        print(f"♻️  Reusing MCP server at {SERVER_URL} (--restart to pick up code changes)")
+        return SERVER_URL
+    
+    SERVER_LOG_FILE.parent.mkdir(exist_ok=True)
+    with open(SERVER_LOG_FILE, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "mcp_server.py", "--sse"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True  # outlive this client
+        )
+    SERVER_PID_FILE.write_text(str(process.pid))
+    print(f"🚀 Started MCP server (pid {process.pid}) at {SERVER_URL}, logging to {SERVER_LOG_FILE}")
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SERVER_STARTUP_TIMEOUT
+    while not _server_is_up():
+        if process.poll() is not None:
+            raise RuntimeError(f"mcp_server.py exited with code {process.returncode}, see {SERVER_LOG_FILE}")
+        if loop.time() > deadline:
+            raise TimeoutError(f"MCP server did not start within {SERVER_STARTUP_TIMEOUT}s")
+        await asyncio.sleep(0.2)
+    
+    return SERVER_URL
+
+
+async def connect():
+    """Open a transport to the MCP server (SSE with --sse, otherwise stdio)."""
+    if "--sse" in sys.argv:
+        return sse_client(await get_or_spawn_server())
     server_params = StdioServerParameters(
         command="python",
         args=["mcp_server.py"],
         env=None
     )
+    return stdio_client(server_params)
+
+
+async def main():
+    """Test MCP server by calling its tools."""
+    print("=" * 60)
+    print("MCP CLIENT TEST - Connecting to MCP Server")
+    print("=" * 60)
     
-    async with stdio_client(server_params) as (read, write):
+    # Connect to your MCP server
+    async with await connect() as (read, write):
         async with ClientSession(read, write) as session:
             # Initialize the connection
-            await session.initialize()
+            init = await session.initialize()
+            if init.serverInfo.name != SERVER_NAME:
+                raise RuntimeError(
+                    f"Connected to {init.serverInfo.name!r}, not {SERVER_NAME!r}; "
+                    f"another server is using port {SERVER_PORT}"
+                )
             
             print("\n✅ Connected to MCP server!")
             
@@ -34,38 +138,31 @@ async def main():
             for tool in tools.tools:
                 print(f"   - {tool.name}: {tool.description}")
             
-            # Test 1: Check for completed games
-            print("\n" + "=" * 60)
-            print("TEST 1: Getting completed games today")
-            print("=" * 60)
+            # Send all three tool calls at once instead of waiting on each round-trip
+            tests = [
+                ("TEST 1: Getting completed games today", "get_completed_games_today",
+                 "⚠️  No content returned (probably no games today)"),
+                ("TEST 2: Checking for new games to post", "check_for_new_games",
+                 "⚠️  No content returned"),
+                ("TEST 3: Getting posted games history", "get_posted_games",
+                 "⚠️  No posted games yet"),
+            ]
+            results = await asyncio.gather(
+                *(session.call_tool(tool, arguments={}) for _, tool, _ in tests),
+                return_exceptions=True
+            )
             
-            result = await session.call_tool("get_completed_games_today", arguments={})
-            if result.content:
-                print(result.content[0].text)
-            else:
-                print("⚠️  No content returned (probably no games today)")
-            
-            # Test 2: Check for new games (not yet posted)
-            print("\n" + "=" * 60)
-            print("TEST 2: Checking for new games to post")
-            print("=" * 60)
-            
-            result = await session.call_tool("check_for_new_games", arguments={})
-            if result.content:
-                print(result.content[0].text)
-            else:
-                print("⚠️  No content returned")
-            
-            # Test 3: Get already posted games
-            print("\n" + "=" * 60)
-            print("TEST 3: Getting posted games history")
-            print("=" * 60)
-            
-            result = await session.call_tool("get_posted_games", arguments={})
-            if result.content:
-                print(result.content[0].text)
-            else:
-                print("⚠️  No posted games yet")
+            for (title, tool, empty_message), result in zip(tests, results):
+                print("\n" + "=" * 60)
+                print(title)
+                print("=" * 60)
+                
+                if isinstance(result, Exception):
+                    print(f"❌ {tool} failed: {result}")
+                elif result.content:
+                    print(result.content[0].text)
+                else:
+                    print(empty_message)
             
             print("\n" + "=" * 60)
             print("✅ All tests completed!")
@@ -73,4 +170,15 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if "--stop" in sys.argv:
+        if not stop_server():
+            print("No background MCP server to stop")
+        sys.exit(0)
+    if "--restart" in sys.argv:
+        stop_server()
+        sys.argv.append("--sse")
+    
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
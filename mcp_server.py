@@ -5,31 +5,104 @@ MCP Server for NBA Agent - Exposes NBA data and Twitter posting to AI agents.
 This allows LangChain or other AI clients to interact with your NBA bot.
 """
 import asyncio
-from typing import Optional, List, Dict, Any
-import json
-from datetime import datetime
+import heapq
+import sys
+from operator import itemgetter
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
 from mcp.server.fastmcp import FastMCP
 from loguru import logger
+from sqlalchemy import delete, select, update
 
-from clients import NBAClient, TwitterClient
-from analyzers import BoxScoreFormatter, InjuryDetector
-from database import DatabaseManager, BoxScorePost, ProcessedTweet
+from analyzers import BoxScoreFormatter
+from database import DatabaseManager, BoxScorePost, ProcessedTweet, existing_values, insert_if_absent, insert_ignoring_duplicates
 from config import settings
+from utils import fast_json
+from utils.lazy import lazy_singleton
+from utils.timeutils import parse_game_date, utc_now
+
+try:
+    import uvloop
+except ImportError:  # optional - falls back to the default asyncio loop
+    uvloop = None
+
+if TYPE_CHECKING:
+    import requests
+    from anthropic import AsyncAnthropic
+    from clients import NBAClient, TwitterClient
+    from analyzers import InjuryDetector
 
 # Initialize MCP Server
 mcp = FastMCP("NBA-Agent-Server")
 
-# Initialize clients
-nba_client = NBAClient()
-twitter_client = TwitterClient()
-db_manager = DatabaseManager(settings.DATABASE_URL)
-db_manager.create_tables()
 formatter = BoxScoreFormatter()
 
-# Initialize injury detector only if tweet monitoring is enabled
-injury_detector = None
-if settings.ENABLE_TWEET_MONITORING and settings.ANTHROPIC_API_KEY:
-    injury_detector = InjuryDetector()
+# Badge suffix for a top performer, indexed by their number of double-digit stats
+PERFORMER_BADGES = ("", "", " 💪DD", " 🔥TRIPLE-DOUBLE")
+
+
+# Clients are built on first use, so the server starts answering right away
+# and a tool only pays for the clients it actually needs
+@lazy_singleton
+def get_db_manager() -> DatabaseManager:
+    """Database manager, creating any missing tables on first use."""
+    manager = DatabaseManager(settings.DATABASE_URL)
+    manager.create_tables()
+    return manager
+
+
+@lazy_singleton
+def get_http_session() -> "requests.Session":
+    """Keep-alive HTTP session shared by the NBA and Twitter clients."""
+    from clients.http import build_session
+    return build_session()
+
+
+@lazy_singleton
+def get_nba_client() -> "NBAClient":
+    """
+    Shared NBA API client.
+    
+    Its games list and box scores are TTL-cached per process, so tools
+    called back to back reuse one upstream fetch instead of each making their own.
+    """
+    from clients import NBAClient
+    return NBAClient(session=get_http_session())
+
+
+@lazy_singleton
+def get_twitter_client() -> "TwitterClient":
+    """Shared Twitter client."""
+    from clients import TwitterClient
+    return TwitterClient(session=get_http_session())
+
+
+@lazy_singleton
+def get_injury_detector() -> Optional["InjuryDetector"]:
+    """Injury detector, or None unless tweet monitoring is enabled."""
+    if settings.ENABLE_TWEET_MONITORING and settings.ANTHROPIC_API_KEY:
+        from analyzers import InjuryDetector
+        return InjuryDetector()
+    return None
+
+
+@lazy_singleton
+def get_anthropic_client() -> "AsyncAnthropic":
+    """Shared async Claude client for tools that call Claude directly."""
+    from anthropic import AsyncAnthropic
+    return AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+
+async def _fetch_game_and_stats(game_id: str):
+    """
+    Look up a completed game and fetch its player stats concurrently.
+    
+    Returns:
+        (game dict or None if not completed today, team stats)
+    """
+    return await asyncio.gather(
+        asyncio.to_thread(get_nba_client().get_completed_game, game_id),
+        asyncio.to_thread(get_nba_client().get_all_players_stats, game_id)
+    )
 
 
 @mcp.tool()
@@ -38,25 +111,69 @@ async def get_completed_games_today() -> List[Dict[str, Any]]:
     Fetches all completed NBA games from today.
     Returns a list of games with scores and team names.
     """
-    games = nba_client.get_completed_games_today()
+    games = await asyncio.to_thread(get_nba_client().get_completed_games_today)
     return games
 
 
 @mcp.tool()
-async def get_game_box_score(game_id: str) -> Dict[str, Any]:
+async def get_game_box_score(game_id: str, detail: bool = False) -> Dict[str, Any]:
     """
-    Fetches detailed box score for a specific game.
-    Includes all player stats (points, rebounds, assists, etc).
+    Fetches the box score for a specific game.
+    By default returns only the top 3 scorers; pass detail=True for every
+    player's stats (points, rebounds, assists, etc).
     
     Args:
         game_id: NBA game ID (e.g., "0022500471")
+        detail: Return the full per-team player stats
     """
-    box_score = nba_client.get_box_score(game_id)
+    box_score = await asyncio.to_thread(get_nba_client().get_box_score, game_id)
     
     if not box_score:
         return {"error": f"No box score found for game {game_id}"}
     
-    return box_score
+    if detail:
+        return box_score
+    
+    # The full box score runs to every player on both rosters; the compact
+    # default keeps the tool result (and the model's input tokens) small
+    players = [p for team in box_score['team_stats'].values() for p in team]
+    return {
+        "game_id": game_id,
+        "players": len(players),
+        "top_scorers": [
+            {
+                "player_name": p['player_name'],
+                "points": p['points'],
+                "rebounds": p['rebounds'],
+                "assists": p['assists']
+            }
+            for p in heapq.nlargest(3, players, key=itemgetter('points'))
+        ]
+    }
+
+
+async def _prepare_game_tweet(game_id: str):
+    """
+    Look up a completed game and format its box score tweet.
+    
+    Shared by format_game_tweet() and post_game_to_twitter(); the NBA client
+    caches the game list and box score, so formatting a game and then posting
+    it makes no second upstream request.
+    
+    Returns:
+        (game dict, tweet text), or (None, None) if not completed today
+    """
+    game, team_stats = await _fetch_game_and_stats(game_id)
+    
+    if not game:
+        return None, None
+    
+    if team_stats:
+        tweet_text = formatter.format_game_with_top_performers(game, team_stats)
+    else:
+        tweet_text = formatter.format_game_summary(game)
+    
+    return game, tweet_text
 
 
 @mcp.tool()
@@ -68,21 +185,11 @@ async def format_game_tweet(game_id: str) -> str:
     Args:
         game_id: NBA game ID
     """
-    # Get game info
-    games = nba_client.get_completed_games_today()
-    game = next((g for g in games if g['game_id'] == game_id), None)
+    game, tweet_text = await _prepare_game_tweet(game_id)
     
     if not game:
         return f"Error: Game {game_id} not found in today's completed games"
     
-    # Get detailed stats
-    team_stats = nba_client.get_all_players_stats(game_id)
-    
-    if team_stats:
-        tweet_text = formatter.format_game_with_top_performers(game, team_stats)
-    else:
-        tweet_text = formatter.format_game_summary(game)
-    
     return tweet_text
 
 
@@ -99,16 +206,12 @@ async def generate_custom_tweet(game_id: str, style: str = "exciting") -> str:
     Returns:
         Generated tweet text (max 280 chars)
     """
-    # Get game info
-    games = nba_client.get_completed_games_today()
-    game = next((g for g in games if g['game_id'] == game_id), None)
+    # Get game info and detailed stats
+    game, team_stats = await _fetch_game_and_stats(game_id)
     
     if not game:
         return f"Error: Game {game_id} not found"
     
-    # Get detailed stats
-    team_stats = nba_client.get_all_players_stats(game_id)
-    
     if not team_stats:
         return formatter.format_game_summary(game)
     
@@ -118,72 +221,94 @@ async def generate_custom_tweet(game_id: str, style: str = "exciting") -> str:
     away_score = game.get('away_score', 0)
     home_score = game.get('home_score', 0)
     
-    # Find top performers
-    all_performances = []
-    for team_id, players in team_stats.items():
-        team_name = away_team if team_id == game.get('away_team_id') else home_team
-        for player in players:
-            perf = {
-                'name': player['player_name'],
-                'team': team_name,
-                'pts': player['points'],
-                'reb': player['rebounds'],
-                'ast': player['assists'],
-                'stl': player['steals'],
-                'blk': player['blocks']
-            }
-            # Check for double-double/triple-double
-            double_digit = sum(1 for stat in [perf['pts'], perf['reb'], perf['ast']] if stat >= 10)
-            perf['double_double'] = double_digit >= 2
-            perf['triple_double'] = double_digit >= 3
-            all_performances.append(perf)
-    
-    # Sort by points
-    top_performers = sorted(all_performances, key=lambda x: x['pts'], reverse=True)[:3]
+    # Pick the top 3 scorers in one pass; only the winners are formatted
+    # (and get their team name resolved)
+    away_team_id = game.get('away_team_id')
+    scorers = (
+        (player['points'], player, team_id)
+        for team_id, players in team_stats.items()
+        for player in players
+    )
+    top_performers = []
+    for pts, player, team_id in heapq.nlargest(3, scorers, key=itemgetter(0)):
+        team_name = away_team if team_id == away_team_id else home_team
+        reb, ast = player['rebounds'], player['assists']
+        double_digit = (pts >= 10) + (reb >= 10) + (ast >= 10)
+        top_performers.append(f"{player['player_name']} ({team_name}): {pts}p/{reb}r/{ast}a{PERFORMER_BADGES[double_digit]}")
     
     # Return structured data that Claude can format
     summary = {
         'matchup': f"{away_team} {away_score} @ {home_team} {home_score}",
         'winner': away_team if away_score > home_score else home_team,
         'margin': abs(away_score - home_score),
-        'top_performers': [
-            f"{p['name']} ({p['team']}): {p['pts']}p/{p['reb']}r/{p['ast']}a" +
-            (" 🔥TRIPLE-DOUBLE" if p['triple_double'] else " 💪DD" if p['double_double'] else "")
-            for p in top_performers
-        ]
+        'top_performers': top_performers
     }
     
-    return json.dumps(summary, indent=2)
+    return fast_json.dumps(summary)
 
 
-@mcp.tool()
-async def post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
+def _claim_and_post(game_id: str, game: Dict[str, Any], tweet_text: str) -> Dict[str, Any]:
     """
-    Post a custom tweet that Claude has crafted.
-    This separates tweet generation from posting, giving Claude full creative control.
+    Reserve the game's BoxScorePost row, then post the tweet and fill in its ID.
+    
+    The reservation is a single INSERT ... ON CONFLICT DO NOTHING, so when tool
+    calls (or the scheduler) race on the same game only one of them tweets.
+    If posting fails the reservation is dropped so the game can be retried.
     
-    Args:
-        game_id: NBA game ID (for database tracking)
-        tweet_text: The tweet text to post (Claude generates this)
-        
     Returns:
-        Success status and tweet_id
+        post_custom_tweet()/post_game_to_twitter() response, minus tweet_text
     """
-    session = db_manager.get_session()
+    db_manager = get_db_manager()
+    row = {
+        "game_id": game_id,
+        "game_date": parse_game_date(game['game_date']),
+        "home_team": game['home_team'],
+        "away_team": game['away_team'],
+        "home_score": game.get('home_score', 0),
+        "away_score": game.get('away_score', 0),
+        "post_text": tweet_text,
+        "tweet_id": None,
+        "posted_at": utc_now()
+    }
     
-    try:
-        # Check if already posted
-        existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-        if existing:
+    with db_manager.session_scope() as session:
+        if not insert_if_absent(session, BoxScorePost, row):
+            existing = session.scalar(select(BoxScorePost.tweet_id).where(BoxScorePost.game_id == game_id))
             return {
                 "success": False,
                 "error": "Already posted",
-                "tweet_id": existing.tweet_id
+                "tweet_id": existing
             }
-        
+    
+    tweet_id = None
+    try:
+        tweet_id = get_twitter_client().post_tweet(tweet_text)
+    finally:
+        with db_manager.session_scope() as session:
+            claimed = BoxScorePost.game_id == game_id
+            if tweet_id:
+                session.execute(update(BoxScorePost).where(claimed).values(tweet_id=tweet_id))
+            else:
+                session.execute(delete(BoxScorePost).where(claimed))
+    
+    if not tweet_id:
+        return {
+            "success": False,
+            "error": "Failed to post to Twitter"
+        }
+    
+    return {
+        "success": True,
+        "tweet_id": tweet_id,
+        "game_id": game_id
+    }
+
+
+def _post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
+    """Blocking part of post_custom_tweet(), run in a worker thread."""
+    try:
         # Get game info for database
-        games = nba_client.get_completed_games_today()
-        game = next((g for g in games if g['game_id'] == game_id), None)
+        game = get_nba_client().get_completed_game(game_id)
         
         if not game:
             return {
@@ -191,63 +316,34 @@ async def post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
                 "error": f"Game {game_id} not found"
             }
         
-        # Post to Twitter
-        tweet_id = twitter_client.post_tweet(tweet_text)
-        
-        if not tweet_id:
-            return {
-                "success": False,
-                "error": "Failed to post to Twitter"
-            }
-        
-        # Save to database
-        from datetime import datetime
-        box_score_post = BoxScorePost(
-            game_id=game_id,
-            game_date=datetime.strptime(game['game_date'], "%Y-%m-%dT%H:%M:%S"),
-            home_team=game['home_team'],
-            away_team=game['away_team'],
-            home_score=game.get('home_score', 0),
-            away_score=game.get('away_score', 0),
-            post_text=tweet_text,
-            tweet_id=tweet_id,
-            posted_at=datetime.utcnow()
-        )
-        session.add(box_score_post)
-        session.commit()
-        
-        return {
-            "success": True,
-            "tweet_id": tweet_id,
-            "game_id": game_id
-        }
-        
+        return _claim_and_post(game_id, game, tweet_text)
+            
     except Exception as e:
-        session.rollback()
         return {
             "success": False,
             "error": str(e)
         }
-    finally:
-        session.close()
 
 
 @mcp.tool()
-async def post_game_to_twitter(game_id: str) -> Dict[str, Any]:
+async def post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
     """
-    Posts a game's box score to Twitter with detailed stats.
-    Checks database to avoid duplicate posts.
+    Post a custom tweet that Claude has crafted.
+    This separates tweet generation from posting, giving Claude full creative control.
     
     Args:
-        game_id: NBA game ID to post
+        game_id: NBA game ID (for database tracking)
+        tweet_text: The tweet text to post (Claude generates this)
         
     Returns:
-        Dictionary with success status and tweet_id if posted
+        Success status and tweet_id
     """
-    session = db_manager.get_session()
-    
-    try:
-        # Check if already posted
+    return await asyncio.to_thread(_post_custom_tweet, game_id, tweet_text)
+
+
+def _already_posted_game(game_id: str) -> Optional[Dict[str, Any]]:
+    """Return post_game_to_twitter()'s "Already posted" response, or None."""
+    with get_db_manager().session_scope() as session:
         existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
         if existing:
             return {
@@ -256,76 +352,82 @@ async def post_game_to_twitter(game_id: str) -> Dict[str, Any]:
                 "tweet_id": existing.tweet_id,
                 "posted_at": str(existing.posted_at)
             }
-        
-        # Get game info
-        games = nba_client.get_completed_games_today()
-        game = next((g for g in games if g['game_id'] == game_id), None)
-        
-        if not game:
-            return {
-                "success": False,
-                "error": f"Game {game_id} not found in today's completed games"
-            }
-        
-        # Format tweet
-        team_stats = nba_client.get_all_players_stats(game_id)
-        if team_stats:
-            tweet_text = formatter.format_game_with_top_performers(game, team_stats)
-        else:
-            tweet_text = formatter.format_game_summary(game)
-        
-        # Post to Twitter
-        tweet_id = twitter_client.post_tweet(tweet_text)
-        
-        if not tweet_id:
-            return {
-                "success": False,
-                "error": "Failed to post to Twitter"
-            }
-        
-        # Save to database
-        from datetime import datetime
-        box_score_post = BoxScorePost(
-            game_id=game_id,
-            game_date=datetime.strptime(game['game_date'], "%Y-%m-%dT%H:%M:%S"),
-            home_team=game['home_team'],
-            away_team=game['away_team'],
-            home_score=game.get('home_score', 0),
-            away_score=game.get('away_score', 0),
-            post_text=tweet_text,
-            tweet_id=tweet_id,
-            posted_at=datetime.utcnow()
-        )
-        session.add(box_score_post)
-        session.commit()
-        
-        return {
-            "success": True,
-            "tweet_id": tweet_id,
-            "game_id": game_id,
-            "tweet_text": tweet_text
-        }
-        
+    return None
+
+
+def _post_game_to_twitter(game_id: str, game: Dict[str, Any], tweet_text: str) -> Dict[str, Any]:
+    """Blocking part of post_game_to_twitter(), run in a worker thread."""
+    try:
+        result = _claim_and_post(game_id, game, tweet_text)
+        if result["success"]:
+            result["tweet_text"] = tweet_text
+        return result
+            
     except Exception as e:
-        session.rollback()
         return {
             "success": False,
             "error": str(e)
         }
-    finally:
-        session.close()
 
 
 @mcp.tool()
-async def get_posted_games() -> List[Dict[str, Any]]:
-    """
-    Gets all games that have been posted to Twitter.
-    Returns game IDs, teams, scores, and tweet IDs.
+async def post_game_to_twitter(game_id: str) -> Dict[str, Any]:
     """
-    session = db_manager.get_session()
+    Posts a game's box score to Twitter with detailed stats.
+    Checks database to avoid duplicate posts.
     
+    Args:
+        game_id: NBA game ID to post
+        
+    Returns:
+        Dictionary with success status and tweet_id if posted
+    """
     try:
-        posts = session.query(BoxScorePost).order_by(BoxScorePost.posted_at.desc()).all()
+        # Check if already posted
+        already_posted = await asyncio.to_thread(_already_posted_game, game_id)
+        if already_posted:
+            return already_posted
+        
+        # Get game info and format the tweet
+        game, tweet_text = await _prepare_game_tweet(game_id)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    
+    if not game:
+        return {
+            "success": False,
+            "error": f"Game {game_id} not found in today's completed games"
+        }
+    
+    return await asyncio.to_thread(_post_game_to_twitter, game_id, game, tweet_text)
+
+
+# Most recent posts returned by get_posted_games
+POSTED_GAMES_LIMIT = 100
+
+
+def _get_posted_games(detail: bool) -> List[Dict[str, Any]]:
+    """Blocking part of get_posted_games(), run in a worker thread."""
+    with get_db_manager().session_scope() as session:
+        posts = (
+            session.query(BoxScorePost)
+            .order_by(BoxScorePost.posted_at.desc())
+            .limit(POSTED_GAMES_LIMIT)
+            .all()
+        )
+        
+        if not detail:
+            return [
+                {
+                    "game_id": post.game_id,
+                    "matchup": f"{post.away_team} @ {post.home_team}",
+                    "tweet_id": post.tweet_id
+                }
+                for post in posts
+            ]
         
         return [
             {
@@ -339,8 +441,50 @@ async def get_posted_games() -> List[Dict[str, Any]]:
             }
             for post in posts
         ]
-    finally:
-        session.close()
+
+
+@mcp.tool()
+async def get_posted_games(detail: bool = False) -> List[Dict[str, Any]]:
+    """
+    Gets the most recent games (up to 100) that have been posted to Twitter,
+    newest first. Returns game IDs, matchups, and tweet IDs; pass detail=True
+    to also get scores and post times.
+    
+    Args:
+        detail: Include scores and posted_at for each game
+    """
+    return await asyncio.to_thread(_get_posted_games, detail)
+
+
+def _check_for_new_games() -> Dict[str, Any]:
+    """Blocking part of check_for_new_games(), run in a worker thread."""
+    # Get all completed games (cached by the NBA client) before taking a DB connection
+    games = get_nba_client().get_completed_games_today()
+    if not games:
+        return {"total_completed": 0, "already_posted": 0, "new_games": []}
+    
+    # Filter out already posted (one query for all games)
+    with get_db_manager().session_scope() as session:
+        posted_ids = existing_values(session, BoxScorePost.game_id, (game['game_id'] for game in games))
+    
+    # Steady state between game endings: everything is already posted
+    if len(posted_ids) == len(games):
+        return {"total_completed": len(games), "already_posted": len(games), "new_games": []}
+    
+    new_games = []
+    for game in games:
+        if game['game_id'] not in posted_ids:
+            new_games.append({
+                "game_id": game['game_id'],
+                "matchup": f"{game['away_team']} @ {game['home_team']}",
+                "score": f"{game.get('away_score', 0)} - {game.get('home_score', 0)}"
+            })
+    
+    return {
+        "total_completed": len(games),
+        "already_posted": len(games) - len(new_games),
+        "new_games": new_games
+    }
 
 
 @mcp.tool()
@@ -349,30 +493,7 @@ async def check_for_new_games() -> Dict[str, Any]:
     Checks for completed games that haven't been posted yet.
     Returns list of game IDs that are ready to post.
     """
-    session = db_manager.get_session()
-    
-    try:
-        # Get all completed games
-        games = nba_client.get_completed_games_today()
-        
-        # Filter out already posted
-        new_games = []
-        for game in games:
-            existing = session.query(BoxScorePost).filter_by(game_id=game['game_id']).first()
-            if not existing:
-                new_games.append({
-                    "game_id": game['game_id'],
-                    "matchup": f"{game['away_team']} @ {game['home_team']}",
-                    "score": f"{game.get('away_score', 0)} - {game.get('home_score', 0)}"
-                })
-        
-        return {
-            "total_completed": len(games),
-            "already_posted": len(games) - len(new_games),
-            "new_games": new_games
-        }
-    finally:
-        session.close()
+    return await asyncio.to_thread(_check_for_new_games)
 
 
 @mcp.tool()
@@ -387,7 +508,9 @@ async def get_recent_tweets(username: str = "ShamsCharania", max_results: int =
     Returns:
         List of tweet dictionaries
     """
-    tweets = twitter_client.get_user_recent_tweets(username, max_results=max_results)
+    tweets = await asyncio.to_thread(
+        get_twitter_client().get_user_recent_tweets, username, max_results=max_results
+    )
     return tweets
 
 
@@ -402,12 +525,12 @@ async def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with is_injury, confidence, and summary
     """
-    if not injury_detector:
+    if not get_injury_detector():
         return {
             "error": "Injury detection not enabled. Set ENABLE_TWEET_MONITORING=true and ANTHROPIC_API_KEY in .env"
         }
     
-    result = injury_detector.is_injury_related(tweet_text)
+    result = await asyncio.to_thread(get_injury_detector().is_injury_related, tweet_text)
     return result
 
 
@@ -422,46 +545,11 @@ async def generate_injury_summary(original_tweet: str) -> str:
     Returns:
         Generated summary tweet text
     """
-    if not injury_detector:
+    if not get_injury_detector():
         return "Error: Injury detection not enabled"
     
-    from anthropic import Anthropic
-    
-    client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    
-    prompt = f"""Create a concise, original tweet (max 280 chars) summarizing this injury news:
-
-Original: "{original_tweet}"
-
-Requirements:
-- Be informative and clear
-- Include player name, team, injury type
-- Include timeline if mentioned (weeks out, questionable, etc.)
-- Use 🏥 emoji
-- Don't copy the original verbatim - rewrite in your own words
-- Keep it under 280 characters
-
-Respond with ONLY the tweet text, nothing else."""
-
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=150,
-            temperature=0.7,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        tweet_text = response.content[0].text.strip()
-        
-        # Remove quotes if present
-        if tweet_text.startswith('"') and tweet_text.endswith('"'):
-            tweet_text = tweet_text[1:-1]
-        
-        # Ensure it's under 280 chars
-        if len(tweet_text) > 280:
-            tweet_text = tweet_text[:277] + "..."
-        
-        return tweet_text
+        return await _generate_injury_summary_tweet(original_tweet)
     except Exception as e:
         logger.error(f"Error generating injury summary: {e}")
         return f"🏥 Injury Update: {original_tweet[:200]}..."
@@ -487,7 +575,7 @@ async def post_injury_tweet(player_name: str, injury_type: str, time_missed: Opt
         tweet_text = f"🏥 Injury Report: {player_name} - {injury_type}."
     
     # Post to Twitter
-    tweet_id = twitter_client.post_tweet(tweet_text)
+    tweet_id = await asyncio.to_thread(get_twitter_client().post_tweet, tweet_text)
     
     if tweet_id:
         return {
@@ -502,42 +590,207 @@ async def post_injury_tweet(player_name: str, injury_type: str, time_missed: Opt
         }
 
 
+def _fetch_new_tweets(username: str):
+    """
+    Fetch tweets posted since the last processed one.
+    
+    Returns:
+        (tweets, IDs of those tweets that were already processed)
+    """
+    db_manager = get_db_manager()
+    
+    # Get last processed tweet ID (the scope closes before the Twitter call)
+    with db_manager.session_scope() as session:
+        last_tweet = (
+            session.query(ProcessedTweet)
+            .filter_by(author_username=username)
+            .order_by(ProcessedTweet.processed_at.desc())
+            .first()
+        )
+        since_id = last_tweet.tweet_id if last_tweet else None
+    
+    # Fetch new tweets
+    tweets = get_twitter_client().get_user_recent_tweets(
+        username=username,
+        max_results=5,
+        since_id=since_id
+    )
+    
+    if not tweets:
+        return [], set()
+    
+    with db_manager.session_scope() as session:
+        processed_ids = existing_values(session, ProcessedTweet.tweet_id, (tweet['id'] for tweet in tweets))
+    
+    return tweets, processed_ids
+
+
+# Static instructions for injury summary tweets; the source tweet goes in the user message
+INJURY_SUMMARY_SYSTEM_PROMPT = """Create a concise, original tweet (max 280 chars) summarizing the injury news you are given.
+
+Requirements:
+- Be informative and clear
+- Include player name, team, injury type
+- Include timeline if mentioned (weeks out, questionable, etc.)
+- Use 🏥 emoji
+- Don't copy the original verbatim - rewrite in your own words
+- Keep it under 280 characters
+
+Respond with ONLY the tweet text, nothing else."""
+
+
+async def _generate_injury_summary_tweet(tweet_text: str) -> str:
+    """Have Claude rewrite an injury report as an original tweet (max 280 chars)."""
+    response = await get_anthropic_client().messages.create(
+        model="claude-sonnet-4-20250514",
+        max_tokens=150,
+        temperature=0.7,
+        system=INJURY_SUMMARY_SYSTEM_PROMPT,
+        messages=[{"role": "user", "content": f'Original: "{tweet_text}"'}]
+    )
+    
+    return _clean_summary_tweet(response.content[0].text)
+
+
+def _clean_summary_tweet(text: str) -> str:
+    """Strip wrapping quotes from a Claude-written tweet and clamp it to 280 chars."""
+    summary_tweet = text.strip()
+    
+    # Remove quotes if present
+    if summary_tweet.startswith('"') and summary_tweet.endswith('"'):
+        summary_tweet = summary_tweet[1:-1]
+    
+    # Ensure it's under 280 chars
+    if len(summary_tweet) > 280:
+        summary_tweet = summary_tweet[:277] + "..."
+    
+    return summary_tweet
+
+
+async def _process_injury_tweet(tweet: Dict[str, Any], username: str, debug_log: List[str]) -> Dict[str, Any]:
+    """
+    Analyze one new tweet and, for a confident injury report, post a summary tweet.
+    Blocking injury detector/Twitter calls run in worker threads so tweets are handled concurrently.
+    
+    Returns:
+        Dictionary with the ProcessedTweet row, and whether it was an injury and was posted
+    """
+    tweet_id = tweet['id']
+    tweet_text = tweet['text']
+    
+    # Analyze for injury; the same call writes the summary tweet
+    debug_log.append(f"   🤖 Analyzing with Claude...")
+    analysis = await asyncio.to_thread(get_injury_detector().classify_and_summarize, tweet_text)
+    is_injury = analysis.get('is_injury', False)
+    confidence = analysis.get('confidence', 0.0)
+    summary = analysis.get('summary', 'No summary')
+    
+    debug_log.append(f"   📊 Result: {'✅ INJURY' if is_injury else '❌ Not injury'} (confidence: {confidence:.2f})")
+    debug_log.append(f"   💬 Summary: {summary}")
+    
+    # Create database row (a plain mapping, bulk-inserted with the others)
+    processed_tweet = {
+        "tweet_id": tweet_id,
+        "author_username": username,
+        "tweet_text": tweet_text,
+        "is_injury_related": is_injury,
+        "reposted": False,
+        "repost_id": None,
+        "processed_at": utc_now()
+    }
+    result = {"row": processed_tweet, "injury": False, "posted": False}
+    
+    # If injury-related and high confidence, create original tweet
+    if is_injury and confidence >= 0.7:
+        result["injury"] = True
+        debug_log.append(f"   🏥 HIGH CONFIDENCE INJURY - Posting summary tweet...")
+        
+        try:
+            # Use the summary from the analysis; only ask again if it came back empty
+            summary_tweet = _clean_summary_tweet(summary)
+            if not summary_tweet:
+                summary_tweet = await _generate_injury_summary_tweet(tweet_text)
+            debug_log.append(f"   📝 Generated: {summary_tweet}")
+            
+            # Post the summary tweet
+            posted_tweet_id = await asyncio.to_thread(get_twitter_client().post_tweet, summary_tweet)
+            
+            if posted_tweet_id:
+                processed_tweet["reposted"] = True
+                processed_tweet["repost_id"] = posted_tweet_id
+                result["posted"] = True
+                debug_log.append(f"   ✅ Successfully posted! Tweet ID: {posted_tweet_id}")
+            else:
+                # Failed to post, but still mark as processed to avoid retrying
+                processed_tweet["reposted"] = False
+                debug_log.append(f"   ❌ Failed to post (rate limit or error)")
+                
+        except Exception as e:
+            logger.error(f"Error generating/posting injury tweet: {e}")
+            debug_log.append(f"   ❌ Error: {str(e)}")
+            # Still mark as processed to avoid infinite retries
+            processed_tweet["reposted"] = False
+            
+    elif is_injury:
+        debug_log.append(f"   ⚠️  Injury detected but confidence too low ({confidence:.2f} < 0.7)")
+    
+    return result
+
+
+class _DiscardLog:
+    """Stands in for a tweet's debug log when no debug output was requested."""
+    
+    __slots__ = ()
+    
+    def append(self, line: str) -> None:
+        pass
+
+
+_DISCARD_LOG = _DiscardLog()
+
+
+# Most tweets analyzed/posted at once, to stay inside Claude and Twitter rate limits
+INJURY_TWEET_WORKERS = 8
+
+
+async def _injury_tweet_worker(queue: asyncio.Queue, username: str, results: List[Dict[str, Any]]) -> None:
+    """Process queued (tweet, debug log) pairs until the queue is empty."""
+    while not queue.empty():
+        tweet, tweet_log = queue.get_nowait()
+        try:
+            results.append(await _process_injury_tweet(tweet, username, tweet_log))
+        except Exception as e:
+            # Not recorded, so the tweet is picked up again on the next check
+            logger.error(f"Error processing tweet {tweet['id']}: {e}")
+            tweet_log.append(f"   ❌ Error: {str(e)}")
+
+
+def _save_processed_tweets(records: List[Dict[str, Any]]) -> None:
+    """Record processed tweets, even ones whose repost failed (to avoid retrying)."""
+    with get_db_manager().session_scope() as session:
+        insert_ignoring_duplicates(session, ProcessedTweet, records)
+
+
 @mcp.tool()
-async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[str, Any]:
+async def check_and_post_injury_tweets(username: str = "ShamsCharania", debug: bool = False) -> Dict[str, Any]:
     """
     Check for new injury-related tweets and post about them.
     Automatically tracks which tweets have been processed.
     
     Args:
         username: Twitter username to monitor
+        debug: Include a step-by-step log of the analysis under "debug"
     
     Returns:
         Summary of processed tweets
     """
-    if not injury_detector:
+    if not get_injury_detector():
         return {
             "error": "Injury detection not enabled. Set ENABLE_TWEET_MONITORING=true and ANTHROPIC_API_KEY in .env"
         }
     
-    session = db_manager.get_session()
-    
     try:
-        # Get last processed tweet ID
-        last_tweet = (
-            session.query(ProcessedTweet)
-            .filter_by(author_username=username)
-            .order_by(ProcessedTweet.processed_at.desc())
-            .first()
-        )
-        
-        since_id = last_tweet.tweet_id if last_tweet else None
-        
-        # Fetch new tweets
-        tweets = twitter_client.get_user_recent_tweets(
-            username=username,
-            max_results=5,
-            since_id=since_id
-        )
+        tweets, processed_ids = await asyncio.to_thread(_fetch_new_tweets, username)
         
         if not tweets:
             return {
@@ -547,140 +800,66 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
                 "message": "No new tweets found"
             }
         
-        injury_count = 0
-        posted_count = 0
-        debug_log = []
-        
-        debug_log.append(f"\n{'='*60}")
-        debug_log.append(f"🔍 DEBUGGING: Analyzing {len(tweets)} tweets from @{username}")
-        debug_log.append(f"{'='*60}\n")
-        
+        # Each tweet gets its own debug section so concurrent processing keeps them in order
+        tweet_logs = []
+        queue = asyncio.Queue()
         for i, tweet in enumerate(tweets, 1):
-            tweet_id = tweet['id']
-            tweet_text = tweet['text']
-            
-            debug_log.append(f"\n📱 Tweet {i}/{len(tweets)}:")
-            debug_log.append(f"   ID: {tweet_id}")
-            debug_log.append(f"   Text: {tweet_text[:200]}{'...' if len(tweet_text) > 200 else ''}")
+            if debug:
+                tweet_text = tweet['text']
+                tweet_log = [
+                    f"\n📱 Tweet {i}/{len(tweets)}:",
+                    f"   ID: {tweet['id']}",
+                    f"   Text: {tweet_text[:200]}{'...' if len(tweet_text) > 200 else ''}"
+                ]
+                tweet_logs.append(tweet_log)
+            else:
+                tweet_log = _DISCARD_LOG
             
             # Check if already processed
-            existing = session.query(ProcessedTweet).filter_by(tweet_id=tweet_id).first()
-            if existing:
-                debug_log.append(f"   ⏭️  Already processed - skipping")
+            if tweet['id'] in processed_ids:
+                tweet_log.append(f"   ⏭️  Already processed - skipping")
                 continue
             
-            # Analyze for injury
-            debug_log.append(f"   🤖 Analyzing with Claude...")
-            analysis = injury_detector.is_injury_related(tweet_text)
-            is_injury = analysis.get('is_injury', False)
-            confidence = analysis.get('confidence', 0.0)
-            summary = analysis.get('summary', 'No summary')
-            
-            debug_log.append(f"   📊 Result: {'✅ INJURY' if is_injury else '❌ Not injury'} (confidence: {confidence:.2f})")
-            debug_log.append(f"   💬 Summary: {summary}")
-            
-            # Create database record
-            processed_tweet = ProcessedTweet(
-                tweet_id=tweet_id,
-                author_username=username,
-                tweet_text=tweet_text,
-                is_injury_related=is_injury,
-                reposted=False,
-                processed_at=datetime.utcnow()
-            )
-            
-            # If injury-related and high confidence, create original tweet
-            if is_injury and confidence >= 0.7:
-                injury_count += 1
-                debug_log.append(f"   🏥 HIGH CONFIDENCE INJURY - Generating summary tweet...")
-                
-                # Generate original summary tweet using Claude
-                from anthropic import Anthropic
-                client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-                
-                try:
-                    prompt = f"""Create a concise, original tweet (max 280 chars) summarizing this injury news:
-
-Original: "{tweet_text}"
-
-Requirements:
-- Be informative and clear
-- Include player name, team, injury type
-- Include timeline if mentioned (weeks out, questionable, etc.)
-- Use 🏥 emoji
-- Don't copy the original verbatim - rewrite in your own words
-- Keep it under 280 characters
-
-Respond with ONLY the tweet text, nothing else."""
-
-                    response = client.messages.create(
-                        model="claude-sonnet-4-20250514",
-                        max_tokens=150,
-                        temperature=0.7,
-                        messages=[{"role": "user", "content": prompt}]
-                    )
-                    
-                    summary_tweet = response.content[0].text.strip()
-                    
-                    # Remove quotes if present
-                    if summary_tweet.startswith('"') and summary_tweet.endswith('"'):
-                        summary_tweet = summary_tweet[1:-1]
-                    
-                    # Ensure it's under 280 chars
-                    if len(summary_tweet) > 280:
-                        summary_tweet = summary_tweet[:277] + "..."
-                    
-                    debug_log.append(f"   📝 Generated: {summary_tweet}")
-                    
-                    # Post the summary tweet
-                    posted_tweet_id = twitter_client.post_tweet(summary_tweet)
-                    
-                    if posted_tweet_id:
-                        processed_tweet.reposted = True
-                        processed_tweet.repost_id = posted_tweet_id
-                        posted_count += 1
-                        debug_log.append(f"   ✅ Successfully posted! Tweet ID: {posted_tweet_id}")
-                    else:
-                        # Failed to post, but still mark as processed to avoid retrying
-                        processed_tweet.reposted = False
-                        debug_log.append(f"   ❌ Failed to post (rate limit or error)")
-                        
-                except Exception as e:
-                    logger.error(f"Error generating/posting injury tweet: {e}")
-                    debug_log.append(f"   ❌ Error: {str(e)}")
-                    # Still mark as processed to avoid infinite retries
-                    processed_tweet.reposted = False
-                    
-            elif is_injury:
-                debug_log.append(f"   ⚠️  Injury detected but confidence too low ({confidence:.2f} < 0.7)")
-            
-            # Always add to session, even if posting failed (to avoid retrying)
-            session.add(processed_tweet)
+            queue.put_nowait((tweet, tweet_log))
         
-        debug_log.append(f"\n{'='*60}")
-        debug_log.append(f"📈 SUMMARY: {len(tweets)} tweets analyzed, {injury_count} injuries found, {posted_count} posted")
-        debug_log.append(f"{'='*60}\n")
+        # A fixed pool of workers drains the queue, bounding concurrent API calls
+        results = []
+        workers = min(INJURY_TWEET_WORKERS, queue.qsize())
+        await asyncio.gather(*(_injury_tweet_worker(queue, username, results) for _ in range(workers)))
         
-        session.commit()
+        injury_count = sum(1 for result in results if result["injury"])
+        posted_count = sum(1 for result in results if result["posted"])
         
-        # Join debug log into a string to return
-        debug_output = "\n".join(debug_log)
+        await asyncio.to_thread(_save_processed_tweets, [result["row"] for result in results])
         
-        return {
+        response = {
             "new_tweets": len(tweets),
             "injury_tweets": injury_count,
             "posted": posted_count,
-            "message": f"Processed {len(tweets)} tweets, found {injury_count} injuries, posted {posted_count}",
-            "debug": debug_output
+            "message": f"Processed {len(tweets)} tweets, found {injury_count} injuries, posted {posted_count}"
         }
         
+        if debug:
+            debug_log = [
+                f"\n{'='*60}",
+                f"🔍 DEBUGGING: Analyzing {len(tweets)} tweets from @{username}",
+                f"{'='*60}\n"
+            ]
+            for tweet_log in tweet_logs:
+                debug_log.extend(tweet_log)
+            debug_log += [
+                f"\n{'='*60}",
+                f"📈 SUMMARY: {len(tweets)} tweets analyzed, {injury_count} injuries found, {posted_count} posted",
+                f"{'='*60}\n"
+            ]
+            response["debug"] = "\n".join(debug_log)
+        
+        return response
+        
     except Exception as e:
-        session.rollback()
         return {
             "error": str(e)
         }
-    finally:
-        session.close()
 
 
 @mcp.tool()
@@ -695,7 +874,7 @@ async def generate_shams_shitpost(tweet_text: str) -> Dict[str, Any]:
     Returns:
         A dictionary with the generated shitpost
     """
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     
     try:
         # Check if XAI_API_KEY is available
@@ -707,7 +886,7 @@ async def generate_shams_shitpost(tweet_text: str) -> Dict[str, Any]:
             }
         
         # Initialize X AI client
-        client = OpenAI(
+        client = AsyncOpenAI(
             api_key=xai_api_key,
             base_url="https://api.x.ai/v1",
         )
@@ -756,7 +935,7 @@ Keep it ABSURD and SHORT!"""
 Generate a troll/parody tweet making fun of this. Keep it short, absurd, and funny!"""
         
         # Call Grok
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="grok-3",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -812,7 +991,9 @@ async def post_shams_shitpost(
         reply_id = original_tweet_id if (reply_to_tweet and original_tweet_id) else None
         
         # Post to Twitter (as reply or standalone)
-        response = twitter_client.post_tweet(shitpost_text, reply_to_tweet_id=reply_id)
+        response = await asyncio.to_thread(
+            get_twitter_client().post_tweet, shitpost_text, reply_to_tweet_id=reply_id
+        )
         
         if response and "id" in response:
             tweet_id = str(response["id"])
@@ -850,5 +1031,11 @@ async def post_shams_shitpost(
 if __name__ == "__main__":
     # MCP servers run over stdio (Standard Input/Output)
     # This allows an LLM client (like Claude via LangChain) to communicate
-    mcp.run()
+    # --sse keeps a long-lived dev server up for mcp_client.py to reuse
+    transport = "sse" if "--sse" in sys.argv else "stdio"
+    if uvloop is not None:
+        # Same transports as mcp.run(), on uvloop's faster event loop
+        uvloop.run(mcp.run_sse_async() if transport == "sse" else mcp.run_stdio_async())
+    else:
+        mcp.run(transport=transport)
 
@@ -1,21 +1,35 @@
 """
 Job scheduler for running agent tasks periodically.
 """
-from apscheduler.schedulers.background import BackgroundScheduler
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from loguru import logger
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from agents import TweetMonitorAgent, BoxScoreAgent
+if TYPE_CHECKING:
+    from agents import TweetMonitorAgent, BoxScoreAgent
+
+# One worker per job type; both jobs' blocking work shares this pool
+MAX_WORKERS = 2
 
 
 class JobScheduler:
-    """Scheduler for running periodic tasks."""
+    """
+    Scheduler for running periodic tasks.
+    
+    The scheduler runs on an asyncio event loop that sleeps until the next
+    job is due, so an idle agent wakes only when there is work. The agents'
+    blocking calls run off the loop in a small thread pool whose threads
+    are created on first use.
+    """
     
     def __init__(
         self,
-        tweet_monitor: TweetMonitorAgent = None,
-        box_score_agent: BoxScoreAgent = None,
+        tweet_monitor: "TweetMonitorAgent" = None,
+        box_score_agent: "BoxScoreAgent" = None,
         tweet_check_interval_minutes: int = 5,
         box_score_post_interval_minutes: int = 60
     ):
@@ -33,7 +47,15 @@ class JobScheduler:
         self.tweet_check_interval = tweet_check_interval_minutes
         self.box_score_interval = box_score_post_interval_minutes
         
-        self.scheduler = BackgroundScheduler()
+        # coalesce: collapse a backlog of missed runs into one
+        # max_instances=1: a run that would overlap the previous one is
+        # skipped, so the pool never holds more than one thread per job
+        self.scheduler = AsyncIOScheduler(
+            job_defaults={'coalesce': True, 'max_instances': 1}
+        )
+        self._loop = None
+        self._stopped = None
+        self._running_jobs = set()
         self._setup_jobs()
     
     def _setup_jobs(self):
@@ -47,6 +69,7 @@ class JobScheduler:
                 trigger=IntervalTrigger(minutes=self.tweet_check_interval),
                 id='tweet_monitor',
                 name='Monitor tweets for injuries',
+                next_run_time=datetime.now(),  # first run as soon as we start
                 replace_existing=True
             )
             jobs_scheduled.append(f"tweet monitoring every {self.tweet_check_interval} min")
@@ -58,6 +81,7 @@ class JobScheduler:
                 trigger=IntervalTrigger(minutes=self.box_score_interval),
                 id='box_score_poster',
                 name='Post NBA box scores',
+                next_run_time=datetime.now(),  # first run as soon as we start
                 replace_existing=True
             )
             jobs_scheduled.append(f"box scores every {self.box_score_interval} min")
@@ -67,48 +91,89 @@ class JobScheduler:
         else:
             logger.warning("No jobs scheduled!")
     
-    def _tweet_monitor_job(self):
+    async def _tweet_monitor_job(self):
         """Job wrapper for tweet monitoring."""
         if not self.tweet_monitor:
             logger.warning("Tweet monitor job triggered but no tweet monitor configured")
             return
+        self._track_current_job()
         try:
             logger.info(f"[{datetime.now()}] Running tweet monitor job")
-            self.tweet_monitor.process_new_tweets()
+            await asyncio.to_thread(self.tweet_monitor.process_new_tweets)
         except Exception as e:
             logger.error(f"Error in tweet monitor job: {e}", exc_info=True)
     
-    def _box_score_job(self):
+    async def _box_score_job(self):
         """Job wrapper for box score posting."""
         if not self.box_score_agent:
             logger.warning("Box score job triggered but no box score agent configured")
             return
+        self._track_current_job()
         try:
             logger.info(f"[{datetime.now()}] Running box score job")
-            self.box_score_agent.post_recent_box_scores()
+            await asyncio.to_thread(self.box_score_agent.post_recent_box_scores)
+            self._log_nba_cache_stats()
         except Exception as e:
             logger.error(f"Error in box score job: {e}", exc_info=True)
     
+    def _track_current_job(self):
+        """Record the running job's task so _run() can let it finish before shutting down."""
+        task = asyncio.current_task()
+        self._running_jobs.add(task)
+        task.add_done_callback(self._running_jobs.discard)
+    
+    def _log_nba_cache_stats(self):
+        """Log the hit ratio of the NBA client's in-memory cache."""
+        stats = self.box_score_agent.nba_client.cache_info().values()
+        hits = sum(s.hits for s in stats)
+        total = hits + sum(s.misses for s in stats)
+        if total:
+            logger.info(f"NBA API cache: {hits}/{total} hits ({hits / total:.1%})")
+    
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler loop is running."""
+        return self.scheduler.running
+    
     def start(self):
-        """Start the scheduler."""
+        """Start the scheduler and block until stop() is called."""
         if not self.scheduler.running:
-            self.scheduler.start()
-            logger.info("Scheduler started successfully")
-            
-            # Run initial jobs immediately
-            logger.info("Running initial jobs...")
-            if self.tweet_monitor:
-                self._tweet_monitor_job()
-            if self.box_score_agent:
-                self._box_score_job()
+            # Initial jobs are queued with next_run_time=now
+            logger.info("Scheduler starting, running initial jobs...")
+            asyncio.run(self._run())
         else:
             logger.warning("Scheduler is already running")
     
+    async def _run(self):
+        """Run the scheduler on the current event loop until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        # asyncio.to_thread() runs the jobs' blocking work in this pool
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='nba-sched')
+        )
+        self._stopped = asyncio.Event()
+        self.scheduler.start()
+        await self._stopped.wait()
+        
+        # shutdown() cancels job tasks still running, so stop new runs and
+        # let the ones in flight finish first
+        self.scheduler.pause()
+        if self._running_jobs:
+            logger.info("Waiting for running jobs to finish...")
+            await asyncio.gather(*self._running_jobs, return_exceptions=True)
+        self.scheduler.shutdown(wait=False)
+        logger.info("Scheduler stopped")
+    
     def stop(self):
-        """Stop the scheduler."""
-        if self.scheduler.running:
-            self.scheduler.shutdown()
-            logger.info("Scheduler stopped")
+        """
+        Stop the scheduler, releasing the thread blocked in start().
+        
+        Safe to call from a signal handler or another thread; start()
+        returns once any job already running has finished.
+        """
+        if self.scheduler.running and self._loop is not None:
+            # _run() does the actual shutdown on the scheduler's loop
+            self._loop.call_soon_threadsafe(self._stopped.set)
         else:
             logger.warning("Scheduler is not running")
     
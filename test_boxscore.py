@@ -3,11 +3,18 @@
 Test script to manually check and display NBA box scores.
 This is useful for testing without waiting for the scheduler.
 """
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
 from clients import TwitterClient, NBAClient
 from analyzers import BoxScoreFormatter
 from config import settings
-from database import DatabaseManager, BoxScorePost
-from datetime import datetime
+from database import DatabaseManager, BoxScorePost, insert_ignoring_duplicates
+from utils.timeutils import parse_game_date, utc_now
+
+# Box score requests in flight at once (stats.nba.com calls are also spaced out by the shared session)
+STATS_FETCH_WORKERS = 4
 
 
 def main():
@@ -23,8 +30,6 @@ def main():
     db_manager = DatabaseManager(settings.DATABASE_URL)
     db_manager.create_tables()
     
-    session = db_manager.get_session()
-    
     # Get completed games from today
     print("Fetching completed games from today...")
     games = nba.get_completed_games_today()
@@ -36,6 +41,23 @@ def main():
     
     print(f"\n✅ Found {len(games)} completed game(s):\n")
     
+    # Already-posted games in one query
+    game_ids = [game['game_id'] for game in games]
+    with db_manager.session_scope() as session:
+        posted = {
+            post.game_id: post
+            for post in session.query(BoxScorePost).filter(BoxScorePost.game_id.in_(game_ids))
+        }
+    
+    # Fetch stats for the remaining games concurrently instead of one after another
+    new_ids = [game_id for game_id in game_ids if game_id not in posted]
+    print(f"Fetching detailed stats for {len(new_ids)} game(s)...")
+    with ThreadPoolExecutor(max_workers=STATS_FETCH_WORKERS) as pool:
+        stats_by_id = dict(zip(new_ids, pool.map(nba.get_all_players_stats, new_ids)))
+    
+    # Tweets built while displaying, posted as-is if the user says yes
+    prepared = {}
+    
     # Display each game
     for i, game in enumerate(games, 1):
         print(f"\n{'='*60}")
@@ -44,7 +66,7 @@ def main():
         
         # Check if already posted
         game_id = game['game_id']
-        existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
+        existing = posted.get(game_id)
         
         if existing:
             print(f"⚠️  This game was already posted on {existing.posted_at}")
@@ -52,9 +74,8 @@ def main():
             print(f"   Skipping to avoid duplicate...")
             continue
         
-        # Try to get detailed player stats
-        print(f"\nFetching detailed stats for game {game_id}...")
-        team_stats = nba.get_all_players_stats(game_id)
+        # Detailed player stats (fetched above)
+        team_stats = stats_by_id[game_id]
         
         # Debug: Show what we got
         if team_stats:
@@ -62,7 +83,7 @@ def main():
             for team_id, players in team_stats.items():
                 print(f"   Team {team_id}: {len(players)} players")
                 # Show top 3 scorers
-                top_3 = sorted(players, key=lambda x: x['points'], reverse=True)[:3]
+                top_3 = heapq.nlargest(3, players, key=itemgetter('points'))
                 for player in top_3:
                     print(f"      {player['player_name']}: {player['points']}pts/"
                           f"{player['rebounds']}reb/{player['assists']}ast")
@@ -80,6 +101,8 @@ def main():
             print("⚠️  Using fallback format (no detailed stats)")
             tweet_text = formatter.format_game_summary(game)
         
+        prepared[game_id] = (game, tweet_text)
+        
         # Display the formatted tweet
         print(tweet_text)
         print("="*60)
@@ -98,46 +121,31 @@ def main():
     
     if response in ['yes', 'y']:
         print("\nPosting to Twitter...")
-        twitter = TwitterClient()
+        # Post through the NBA client's pooled keep-alive session
+        twitter = TwitterClient(session=nba.session)
+        
+        # Rows for the tweets that went out, saved together after the loop
+        new_posts = []
         
         try:
-            for game in games:
-                game_id = game['game_id']
-                
-                # Skip if already posted (check again in case multiple games)
-                existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-                if existing:
-                    print(f"⏭️  Skipping game {game_id} (already posted)")
-                    continue
-                
-                # Get formatted tweet
-                team_stats = nba.get_all_players_stats(game_id)
-                if team_stats:
-                    tweet_text = formatter.format_game_with_top_performers(game, team_stats)
-                else:
-                    tweet_text = formatter.format_game_summary(game)
-                
+            # Already-posted games were skipped above, so only prepared tweets are posted
+            for game_id, (game, tweet_text) in prepared.items():
                 # Post it
                 tweet_id = twitter.post_tweet(tweet_text)
                 
                 if tweet_id:
                     print(f"✅ Posted game {game_id} as tweet {tweet_id}")
-                    
-                    # Save to database
-                    box_score_post = BoxScorePost(
-                        game_id=game_id,
-                        game_date=datetime.strptime(game['game_date'], "%Y-%m-%dT%H:%M:%S"),
-                        home_team=game['home_team'],
-                        away_team=game['away_team'],
-                        home_score=game.get('home_score', 0),
-                        away_score=game.get('away_score', 0),
-                        post_text=tweet_text,
-                        tweet_id=tweet_id,
-                        posted_at=datetime.utcnow()
-                    )
-                    session.add(box_score_post)
-                    session.commit()
-                    print(f"   💾 Saved to database")
+                    new_posts.append({
+                        "game_id": game_id,
+                        "game_date": parse_game_date(game['game_date']),
+                        "home_team": game['home_team'],
+                        "away_team": game['away_team'],
+                        "home_score": game.get('home_score', 0),
+                        "away_score": game.get('away_score', 0),
+                        "post_text": tweet_text,
+                        "tweet_id": tweet_id,
+                        "posted_at": utc_now()
+                    })
                 else:
                     print(f"❌ Failed to post game {game_id}")
             
@@ -145,12 +153,14 @@ def main():
             
         except Exception as e:
             print(f"\n❌ Error during posting: {e}")
-            session.rollback()
         finally:
-            session.close()
+            # Save even after an error, so posted games aren't tweeted again next run
+            if new_posts:
+                with db_manager.session_scope() as session:
+                    insert_ignoring_duplicates(session, BoxScorePost, new_posts)
+                print(f"   💾 Saved {len(new_posts)} post(s) to database")
     else:
         print("\n⏭️  Skipping Twitter posting.")
-        session.close()
     
     print("\n" + "=" * 60)
     print("Test complete!")
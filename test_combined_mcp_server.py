@@ -4,29 +4,53 @@ Combined Test MCP Server - Tests BOTH box scores and injuries with dummy data.
 
 Run with: python ai_agent.py --test
 """
+import heapq
+import sys
 import json
+from operator import itemgetter
 from typing import Optional, List, Dict, Any
-from datetime import datetime
 from mcp.server.fastmcp import FastMCP
+from sqlalchemy import select
 
-from clients import TwitterClient
-from database import DatabaseManager, BoxScorePost, ProcessedTweet
+from analyzers.keyword_matcher import KeywordMatcher
+from database import DatabaseManager, BoxScorePost, ProcessedTweet, existing_values, insert_if_absent, insert_ignoring_duplicates
 from config import settings
+from utils import fast_json
+from utils.lazy import lazy_singleton
+from utils.timeutils import parse_game_date, utc_now
 
 # Initialize MCP Server
 mcp = FastMCP("NBA-Agent-Combined-Test-Server")
 
-# Initialize clients
-twitter_client = TwitterClient()
-db_manager = DatabaseManager(settings.DATABASE_URL)
-db_manager.create_tables()
+# Nothing is posted in test mode, so no Twitter client; the database is
+# opened on first use so the server starts answering right away
+@lazy_singleton
+def get_db_manager() -> DatabaseManager:
+    """Database manager, creating any missing tables on first use."""
+    manager = DatabaseManager(settings.DATABASE_URL)
+    manager.create_tables()
+    return manager
+
 
 # Load test data
-with open("test_data.json", "r") as f:
-    box_score_test_data = json.load(f)
+with open("test_data.json", "rb") as f:
+    box_score_test_data = fast_json.loads(f.read())
+test_games_by_id = {g["game_id"]: g for g in box_score_test_data["games"]}
+# Parsed once here; the game dicts themselves stay JSON-serializable for the tools
+test_game_dates = {game_id: parse_game_date(g["game_date"]) for game_id, g in test_games_by_id.items()}
+
+with open("test_injury_data.json", "rb") as f:
+    injury_test_data = fast_json.loads(f.read())
+
+# Keyword heuristics used in place of the AI injury detector in test mode
+INJURY_KEYWORDS = (
+    "injury", "injured", "hurt", "sprain", "strain", "tear", "torn",
+    "surgery", "MRI", "out", "miss", "questionable", "doubtful", "ruled out"
+)
+_INJURY_MATCHER = KeywordMatcher(INJURY_KEYWORDS)
 
-with open("test_injury_data.json", "r") as f:
-    injury_test_data = json.load(f)
+# Badge suffix for a top performer, indexed by their number of double-digit stats
+PERFORMER_BADGES = ("", "", " 💪DD", " 🔥TRIPLE-DOUBLE")
 
 
 # ============================================================
@@ -54,123 +78,102 @@ async def get_completed_games_today() -> List[Dict[str, Any]]:
 @mcp.tool()
 async def generate_custom_tweet(game_id: str, style: str = "exciting") -> str:
     """Generate custom tweet data for Claude to format."""
-    game_data = next((g for g in box_score_test_data["games"] if g["game_id"] == game_id), None)
+    game_data = test_games_by_id.get(game_id)
     if not game_data:
-        return json.dumps({"error": f"Test game {game_id} not found"})
+        return fast_json.dumps({"error": f"Test game {game_id} not found"})
     
     away_team = game_data["away_team"]
     home_team = game_data["home_team"]
     away_score = game_data["away_score"]
     home_score = game_data["home_score"]
     
-    # Find top performers
-    all_performances = []
-    for team_id, players in game_data["player_stats"].items():
-        team_name = away_team if team_id == str(game_data["away_team_id"]) else home_team
-        for player in players:
-            perf = {
-                "name": player["player_name"],
-                "team": team_name,
-                "pts": player["points"],
-                "reb": player["rebounds"],
-                "ast": player["assists"],
-                "stl": player["steals"],
-                "blk": player["blocks"]
-            }
-            double_digit = sum(1 for stat in [perf["pts"], perf["reb"], perf["ast"]] if stat >= 10)
-            perf["double_double"] = double_digit >= 2
-            perf["triple_double"] = double_digit >= 3
-            all_performances.append(perf)
-    
-    top_performers = sorted(all_performances, key=lambda x: x["pts"], reverse=True)[:3]
+    # Pick the top 3 scorers in one pass; only the winners are formatted
+    # (and get their team name resolved)
+    away_team_id = str(game_data["away_team_id"])
+    scorers = (
+        (player["points"], player, team_id)
+        for team_id, players in game_data["player_stats"].items()
+        for player in players
+    )
+    top_performers = []
+    for pts, player, team_id in heapq.nlargest(3, scorers, key=itemgetter(0)):
+        team_name = away_team if team_id == away_team_id else home_team
+        reb, ast = player["rebounds"], player["assists"]
+        double_digit = (pts >= 10) + (reb >= 10) + (ast >= 10)
+        top_performers.append(f"{player['player_name']} ({team_name}): {pts}p/{reb}r/{ast}a{PERFORMER_BADGES[double_digit]}")
     
     summary = {
         "matchup": f"{away_team} {away_score} @ {home_team} {home_score}",
         "winner": away_team if away_score > home_score else home_team,
         "margin": abs(away_score - home_score),
-        "top_performers": [
-            f"{p['name']} ({p['team']}): {p['pts']}p/{p['reb']}r/{p['ast']}a" +
-            (" 🔥TRIPLE-DOUBLE" if p["triple_double"] else " 💪DD" if p["double_double"] else "")
-            for p in top_performers
-        ]
+        "top_performers": top_performers
     }
     
-    return json.dumps(summary, indent=2)
+    return fast_json.dumps(summary)
 
 
 @mcp.tool()
 async def post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
     """Post a custom tweet. In TEST MODE, only prints the tweet."""
-    session = db_manager.get_session()
-    
     try:
-        # Check if already posted
-        existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-        if existing:
-            return {
-                "success": False,
-                "error": "Already posted",
-                "tweet_id": existing.tweet_id,
-                "note": "TEST MODE - Game already processed"
-            }
-        
         # Get game info
-        game_data = next((g for g in box_score_test_data["games"] if g["game_id"] == game_id), None)
+        game_data = test_games_by_id.get(game_id)
         if not game_data:
             return {"success": False, "error": f"Test game {game_id} not found"}
         
-        # TEST MODE: Don't post to Twitter, just print
-        print("\n" + "=" * 60)
-        print("🧪 TEST MODE - Generated Tweet (NOT posted to Twitter):")
-        print("=" * 60)
-        print(tweet_text)
-        print("=" * 60)
-        print(f"Length: {len(tweet_text)} characters")
-        print("=" * 60 + "\n")
-        
-        # Save to database
-        box_score_post = BoxScorePost(
-            game_id=game_id,
-            game_date=datetime.strptime(game_data["game_date"], "%Y-%m-%dT%H:%M:%S"),
-            home_team=game_data["home_team"],
-            away_team=game_data["away_team"],
-            home_score=game_data["home_score"],
-            away_score=game_data["away_score"],
-            post_text=tweet_text,
-            tweet_id="TEST_MODE_NO_POST",
-            posted_at=datetime.utcnow()
-        )
-        session.add(box_score_post)
-        session.commit()
-        
-        return {
-            "success": True,
-            "tweet_id": "TEST_MODE_NO_POST",
-            "game_id": game_id,
-            "tweet_text": tweet_text,
-            "note": "TEST MODE - Tweet generated but NOT posted to Twitter"
-        }
-        
+        with get_db_manager().session_scope() as session:
+            # Save to database with test marker (so it won't try to post again);
+            # the INSERT ... ON CONFLICT DO NOTHING doubles as the already-posted check
+            claimed = insert_if_absent(session, BoxScorePost, {
+                "game_id": game_id,
+                "game_date": test_game_dates[game_id],
+                "home_team": game_data["home_team"],
+                "away_team": game_data["away_team"],
+                "home_score": game_data["home_score"],
+                "away_score": game_data["away_score"],
+                "post_text": tweet_text,
+                "tweet_id": "TEST_MODE_NO_POST",
+                "posted_at": utc_now()
+            })
+            if not claimed:
+                return {
+                    "success": False,
+                    "error": "Already posted",
+                    "tweet_id": session.scalar(select(BoxScorePost.tweet_id).where(BoxScorePost.game_id == game_id)),
+                    "note": "TEST MODE - Game already processed"
+                }
+            
+            # TEST MODE: Don't post to Twitter, just print
+            # One write for the whole block, to stderr: under stdio, stdout carries the MCP protocol
+            sys.stderr.write("\n".join([
+                "", "=" * 60, "🧪 TEST MODE - Generated Tweet (NOT posted to Twitter):", "=" * 60,
+                tweet_text, "=" * 60,
+                f"Length: {len(tweet_text)} characters", "=" * 60, "", ""
+            ]))
+            
+            return {
+                "success": True,
+                "tweet_id": "TEST_MODE_NO_POST",
+                "game_id": game_id,
+                "tweet_text": tweet_text,
+                "note": "TEST MODE - Tweet generated but NOT posted to Twitter"
+            }
+            
     except Exception as e:
-        session.rollback()
         return {"success": False, "error": str(e)}
-    finally:
-        session.close()
 
 
 @mcp.tool()
 async def check_for_new_games() -> Dict[str, Any]:
     """Check for test games that haven't been posted yet."""
-    session = db_manager.get_session()
-    
-    try:
-        games = box_score_test_data["games"]
+    with get_db_manager().session_scope() as session:
         new_games = []
         
-        for game_data in games:
-            game_id = game_data["game_id"]
-            existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-            if not existing:
+        # One IN query for every game instead of one lookup per game
+        posted_ids = existing_values(session, BoxScorePost.game_id, test_games_by_id)
+        
+        for game_id, game_data in test_games_by_id.items():
+            if game_id not in posted_ids:
                 new_games.append({
                     "game_id": game_id,
                     "matchup": f"{game_data['away_team']} @ {game_data['home_team']}",
@@ -178,13 +181,11 @@ async def check_for_new_games() -> Dict[str, Any]:
                 })
         
         return {
-            "total_completed": len(games),
-            "already_posted": len(games) - len(new_games),
+            "total_completed": len(test_games_by_id),
+            "already_posted": len(test_games_by_id) - len(new_games),
             "new_games": new_games,
             "note": "TEST MODE - Using dummy game data"
         }
-    finally:
-        session.close()
 
 
 # ============================================================
@@ -194,21 +195,17 @@ async def check_for_new_games() -> Dict[str, Any]:
 @mcp.tool()
 async def get_recent_tweets(username: str = "ShamsCharania", max_results: int = 10) -> List[Dict[str, Any]]:
     """Get recent tweets from test data (simulates Twitter API)."""
-    tweets = injury_test_data["tweets"][:max_results]
-    return tweets
+    tweets = injury_test_data["tweets"]
+    # The fixture list is never modified, so hand it out as is unless it needs trimming
+    return tweets if max_results >= len(tweets) else tweets[:max_results]
 
 
 @mcp.tool()
-async def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
+def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
     """Analyze a tweet for injury content. In test mode, uses keyword matching."""
     # Simple keyword-based detection
-    injury_keywords = [
-        "injury", "injured", "hurt", "sprain", "strain", "tear", "torn",
-        "surgery", "MRI", "out", "miss", "questionable", "doubtful", "ruled out"
-    ]
-    
-    text_lower = tweet_text.lower()
-    keyword_count = sum(1 for keyword in injury_keywords if keyword in text_lower)
+    # Confidence stops rising at 3 keywords, so stop counting there
+    keyword_count = _INJURY_MATCHER.count(tweet_text.lower(), limit=3)
     
     is_injury = keyword_count >= 2
     confidence = min(0.9, 0.5 + (keyword_count * 0.15))
@@ -230,13 +227,12 @@ async def post_injury_tweet(player_name: str, injury_type: str, time_missed: Opt
         tweet_text = f"🏥 Injury Report: {player_name} - {injury_type}."
     
     # TEST MODE: Don't post to Twitter, just print
-    print("\n" + "=" * 60)
-    print("🧪 TEST MODE - Generated Injury Tweet (NOT posted):")
-    print("=" * 60)
-    print(tweet_text)
-    print("=" * 60)
-    print(f"Length: {len(tweet_text)} characters")
-    print("=" * 60 + "\n")
+    # One write for the whole block, to stderr: under stdio, stdout carries the MCP protocol
+    sys.stderr.write("\n".join([
+        "", "=" * 60, "🧪 TEST MODE - Generated Injury Tweet (NOT posted):", "=" * 60,
+        tweet_text, "=" * 60,
+        f"Length: {len(tweet_text)} characters", "=" * 60, "", ""
+    ]))
     
     return {
         "success": True,
@@ -249,104 +245,109 @@ async def post_injury_tweet(player_name: str, injury_type: str, time_missed: Opt
 @mcp.tool()
 async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[str, Any]:
     """Check for new injury-related tweets. In TEST MODE, uses dummy data."""
-    session = db_manager.get_session()
-    
     try:
-        tweets = injury_test_data["tweets"]
-        
-        injury_count = 0
-        posted_count = 0
-        processed_tweets = []
-        
-        for tweet_data in tweets:
-            tweet_id = tweet_data['id']
-            tweet_text = tweet_data['text']
-            
-            # Check if already processed
-            existing = session.query(ProcessedTweet).filter_by(tweet_id=tweet_id).first()
-            if existing:
-                continue
+        with get_db_manager().session_scope() as session:
+            tweets = injury_test_data["tweets"]
             
-            # Analyze for injury
-            analysis = await analyze_tweet_for_injury(tweet_text)
-            is_injury = analysis.get('is_injury', False)
-            confidence = analysis.get('confidence', 0.0)
+            injury_count = 0
+            posted_count = 0
+            processed_tweets = []
+            rows = []
+            # One timestamp for the whole batch
+            processed_at = utc_now()
             
-            # Create database record
-            processed_tweet = ProcessedTweet(
-                tweet_id=tweet_id,
-                author_username=username,
-                tweet_text=tweet_text,
-                is_injury_related=is_injury,
-                reposted=False,
-                repost_id="TEST_MODE_NO_POST" if is_injury else None,
-                processed_at=datetime.utcnow()
-            )
+            # Look up which tweets were already processed in one query
+            processed_ids = existing_values(session, ProcessedTweet.tweet_id, (tweet['id'] for tweet in tweets))
             
-            # If injury-related and high confidence, "post" it
-            if is_injury and confidence >= 0.7:
-                injury_count += 1
+            for tweet_data in tweets:
+                tweet_id = tweet_data['id']
+                tweet_text = tweet_data['text']
+                
+                # Check if already processed
+                if tweet_id in processed_ids:
+                    continue
                 
-                # Extract simple info and post
-                print(f"\n🏥 Found injury tweet: {tweet_text[:100]}...")
-                processed_tweet.reposted = True
-                processed_tweet.repost_id = "TEST_MODE_INJURY_POST"
-                posted_count += 1
+                # Analyze for injury
+                analysis = analyze_tweet_for_injury(tweet_text)
+                is_injury = analysis.get('is_injury', False)
+                confidence = analysis.get('confidence', 0.0)
                 
-                processed_tweets.append({
+                # Database row, inserted with the others after the loop
+                processed_tweet = {
                     "tweet_id": tweet_id,
-                    "text": tweet_text[:100] + "...",
-                    "posted": True
-                })
+                    "author_username": username,
+                    "tweet_text": tweet_text,
+                    "is_injury_related": is_injury,
+                    "reposted": False,
+                    "repost_id": "TEST_MODE_NO_POST" if is_injury else None,
+                    "processed_at": processed_at
+                }
+                
+                # If injury-related and high confidence, "post" it
+                if is_injury and confidence >= 0.7:
+                    injury_count += 1
+                    
+                    # Extract simple info and post
+                    sys.stderr.write(f"\n🏥 Found injury tweet: {tweet_text[:100]}...\n")
+                    processed_tweet["reposted"] = True
+                    processed_tweet["repost_id"] = "TEST_MODE_INJURY_POST"
+                    posted_count += 1
+                    
+                    processed_tweets.append({
+                        "tweet_id": tweet_id,
+                        "text": tweet_text[:100] + "...",
+                        "posted": True
+                    })
+                
+                rows.append(processed_tweet)
+            
+            insert_ignoring_duplicates(session, ProcessedTweet, rows)
+            
+            return {
+                "new_tweets": len(tweets),
+                "injury_tweets": injury_count,
+                "posted": posted_count,
+                "processed_tweets": processed_tweets,
+                "message": f"TEST MODE: Processed {len(tweets)} tweets, found {injury_count} injuries, posted {posted_count}",
+                "note": "TEST MODE - No actual tweets posted to Twitter"
+            }
             
-            session.add(processed_tweet)
-        
-        session.commit()
-        
-        return {
-            "new_tweets": len(tweets),
-            "injury_tweets": injury_count,
-            "posted": posted_count,
-            "processed_tweets": processed_tweets,
-            "message": f"TEST MODE: Processed {len(tweets)} tweets, found {injury_count} injuries, posted {posted_count}",
-            "note": "TEST MODE - No actual tweets posted to Twitter"
-        }
-        
     except Exception as e:
-        session.rollback()
         return {
             "error": str(e)
         }
-    finally:
-        session.close()
 
 
 @mcp.tool()
 async def get_processed_injury_tweets() -> List[Dict[str, Any]]:
     """Get all processed injury tweets from database."""
-    session = db_manager.get_session()
-    
-    try:
-        tweets = (
-            session.query(ProcessedTweet)
-            .filter_by(is_injury_related=True)
+    with get_db_manager().session_scope() as session:
+        # Only the columns returned, streamed in chunks rather than loaded as ORM objects
+        rows = session.execute(
+            select(
+                ProcessedTweet.tweet_id,
+                ProcessedTweet.author_username,
+                ProcessedTweet.tweet_text,
+                ProcessedTweet.reposted,
+                ProcessedTweet.repost_id,
+                ProcessedTweet.processed_at
+            )
+            .where(ProcessedTweet.is_injury_related.is_(True))
             .order_by(ProcessedTweet.processed_at.desc())
-            .all()
+            .execution_options(yield_per=500)
         )
         
         return [
             {
-                "tweet_id": tweet.tweet_id,
-                "author": tweet.author_username,
-                "text": tweet.tweet_text,
-                "reposted": tweet.reposted,
-                "repost_id": tweet.repost_id,
-                "processed_at": str(tweet.processed_at)
+                "tweet_id": tweet_id,
+                "author": author,
+                "text": text,
+                "reposted": reposted,
+                "repost_id": repost_id,
+                "processed_at": str(processed_at)
             }
-            for tweet in tweets
+            for tweet_id, author, text, reposted, repost_id, processed_at in rows
         ]
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
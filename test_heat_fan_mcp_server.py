@@ -4,11 +4,13 @@ TEST MCP Server for Heat Fan Bot
 Uses dummy data to simulate a live Heat game
 """
 import asyncio
+import sys
+from operator import sub
 from typing import Optional, List, Dict, Any
 import json
-from datetime import datetime
 from mcp.server.fastmcp import FastMCP
 from loguru import logger
+from utils.timeutils import utc_now
 
 # Initialize MCP Server
 mcp = FastMCP("Test-Heat-Fan-Server")
@@ -24,17 +26,52 @@ GAME_STATE = {
     "opponent": "BOS",
 }
 
-# Dummy player stats that change each check
+# Stats tracked per player, in the same order as heat_fan_mcp_server.py
+PLAYER_STAT_FIELDS = (
+    "points", "field_goals_made", "field_goals_attempted",
+    "rebounds", "assists", "turnovers",
+)
+_FIELD_INDEX = {field: i for i, field in enumerate(PLAYER_STAT_FIELDS)}
+
+# Dummy player stats that change each check (one list per player, in PLAYER_STAT_FIELDS order)
 PLAYER_STATS = {
-    "Bam Adebayo": {"points": 7, "rebounds": 8, "assists": 1, "fgm": 3, "fga": 5, "turnovers": 0},
-    "Jimmy Butler": {"points": 15, "rebounds": 4, "assists": 5, "fgm": 6, "fga": 12, "turnovers": 2},
-    "Tyler Herro": {"points": 8, "rebounds": 2, "assists": 2, "fgm": 3, "fga": 9, "turnovers": 0},
+    "Bam Adebayo": [7, 3, 5, 8, 1, 0],
+    "Jimmy Butler": [15, 6, 12, 4, 5, 2],
+    "Tyler Herro": [8, 3, 9, 2, 2, 0],
+}
+
+# Scripted stat changes, applied on the matching check (check 1 and
+# anything after 5 change nothing): check -> {player_name: {field: delta}}
+CHECK_DELTAS = {
+    # Bam misses 3 shots in a row (no points)
+    2: {"Bam Adebayo": {"field_goals_attempted": 3, "turnovers": 1}},
+    # Jimmy goes OFF - 10 points in 3 minutes
+    3: {"Jimmy Butler": {"points": 10, "field_goals_made": 4, "field_goals_attempted": 5}},
+    # Tyler Herro can't hit anything (no makes)
+    4: {"Tyler Herro": {"field_goals_attempted": 5}},
+    # Bam redemption arc
+    5: {"Bam Adebayo": {"points": 8, "field_goals_made": 4, "field_goals_attempted": 4, "rebounds": 4}},
 }
+# Heat score change on each check
+HEAT_SCORE_DELTAS = {3: 10}
 
-# Store last snapshot for comparison
+# Last saved snapshot, as player_name -> PLAYER_STAT_FIELDS tuple
 LAST_SNAPSHOT = None
 
 
+def _bump(player_name: str, **deltas: int):
+    """Add deltas (keyed by PLAYER_STAT_FIELDS name) to a player's stats."""
+    stats = PLAYER_STATS[player_name]
+    for field, delta in deltas.items():
+        stats[_FIELD_INDEX[field]] += delta
+
+
+def _stat_tuple(player: Dict) -> tuple:
+    """Pull PLAYER_STAT_FIELDS out of a player stat dict as a tuple of ints."""
+    get = player.get
+    return tuple([get(f, 0) for f in PLAYER_STAT_FIELDS])
+
+
 @mcp.tool()
 async def get_live_heat_game() -> Dict[str, Any]:
     """Check if there's a live Heat game (always returns True in test mode)"""
@@ -54,49 +91,20 @@ async def get_live_heat_game() -> Dict[str, Any]:
 @mcp.tool()
 async def get_heat_box_score(game_id: str) -> Dict[str, Any]:
     """Get current box score (returns evolving dummy data)"""
-    global GAME_STATE, PLAYER_STATS
-    
     # Evolve the game state based on check count
     GAME_STATE["check_count"] += 1
     check = GAME_STATE["check_count"]
     
     # Simulate different scenarios
-    if check == 1:
-        # First check - nothing special
-        pass
-    elif check == 2:
-        # Bam misses 3 shots in a row (no points)
-        PLAYER_STATS["Bam Adebayo"]["fga"] += 3
-        PLAYER_STATS["Bam Adebayo"]["turnovers"] += 1
-    elif check == 3:
-        # Jimmy goes OFF - 10 points in 3 minutes
-        PLAYER_STATS["Jimmy Butler"]["points"] += 10
-        PLAYER_STATS["Jimmy Butler"]["fgm"] += 4
-        PLAYER_STATS["Jimmy Butler"]["fga"] += 5
-        GAME_STATE["heat_score"] += 10
-    elif check == 4:
-        # Tyler Herro can't hit anything
-        PLAYER_STATS["Tyler Herro"]["fga"] += 5
-        # No makes
-    elif check == 5:
-        # Bam redemption arc
-        PLAYER_STATS["Bam Adebayo"]["points"] += 8
-        PLAYER_STATS["Bam Adebayo"]["fgm"] += 4
-        PLAYER_STATS["Bam Adebayo"]["fga"] += 4
-        PLAYER_STATS["Bam Adebayo"]["rebounds"] += 4
+    for player_name, deltas in CHECK_DELTAS.get(check, {}).items():
+        _bump(player_name, **deltas)
+    GAME_STATE["heat_score"] += HEAT_SCORE_DELTAS.get(check, 0)
     
     # Convert to expected format
-    heat_players = []
-    for name, stats in PLAYER_STATS.items():
-        heat_players.append({
-            "player_name": name,
-            "points": stats["points"],
-            "rebounds": stats["rebounds"],
-            "assists": stats["assists"],
-            "field_goals_made": stats["fgm"],
-            "field_goals_attempted": stats["fga"],
-            "turnovers": stats["turnovers"],
-        })
+    heat_players = [
+        {"player_name": name, **dict(zip(PLAYER_STAT_FIELDS, stats))}
+        for name, stats in PLAYER_STATS.items()
+    ]
     
     return {
         "game_id": game_id,
@@ -118,37 +126,32 @@ async def compare_box_scores(game_id: str, current_stats: List[Dict]) -> Dict[st
         }
     
     # Compare
-    old_stats_by_player = {p['player_name']: p for p in LAST_SNAPSHOT}
-    
     changes = []
     for current_player in current_stats:
         name = current_player['player_name']
-        old_player = old_stats_by_player.get(name)
+        old_player = LAST_SNAPSHOT.get(name)
         
         if not old_player:
             continue
         
-        pts_diff = current_player['points'] - old_player['points']
-        fgm_diff = current_player['field_goals_made'] - old_player['field_goals_made']
-        fga_diff = current_player['field_goals_attempted'] - old_player['field_goals_attempted']
-        reb_diff = current_player['rebounds'] - old_player['rebounds']
-        ast_diff = current_player['assists'] - old_player['assists']
-        to_diff = current_player['turnovers'] - old_player['turnovers']
+        current = _stat_tuple(current_player)
+        if current == old_player:
+            continue
         
-        if any([pts_diff, fgm_diff, fga_diff, reb_diff, ast_diff, to_diff]):
-            changes.append({
-                "player": name,
-                "points_change": pts_diff,
-                "fgm_change": fgm_diff,
-                "fga_change": fga_diff,
-                "rebounds_change": reb_diff,
-                "assists_change": ast_diff,
-                "turnovers_change": to_diff,
-                "current_points": current_player['points'],
-                "current_rebounds": current_player['rebounds'],
-                "current_assists": current_player['assists'],
-                "missed_shots": fga_diff - fgm_diff,
-            })
+        pts_diff, fgm_diff, fga_diff, reb_diff, ast_diff, to_diff = map(sub, current, old_player)
+        changes.append({
+            "player": name,
+            "points_change": pts_diff,
+            "fgm_change": fgm_diff,
+            "fga_change": fga_diff,
+            "rebounds_change": reb_diff,
+            "assists_change": ast_diff,
+            "turnovers_change": to_diff,
+            "current_points": current[0],
+            "current_rebounds": current[3],
+            "current_assists": current[4],
+            "missed_shots": fga_diff - fgm_diff,
+        })
     
     return {
         "first_check": False,
@@ -169,23 +172,39 @@ async def save_snapshot(
     """Save current snapshot"""
     global LAST_SNAPSHOT
     
-    LAST_SNAPSHOT = heat_stats
+    LAST_SNAPSHOT = {p['player_name']: _stat_tuple(p) for p in heat_stats}
     
     return {
         "success": True,
         "snapshot_id": GAME_STATE["check_count"],
-        "saved_at": str(datetime.utcnow())
+        "saved_at": str(utc_now())
     }
 
 
+@mcp.tool()
+async def save_snapshot_and_diff(
+    game_id: str,
+    period: int,
+    game_clock: str,
+    heat_score: int,
+    opponent_score: int,
+    heat_stats: List[Dict]
+) -> Dict[str, Any]:
+    """Compare to last snapshot, then save current snapshot"""
+    result = await compare_box_scores(game_id, heat_stats)
+    result.update(await save_snapshot(
+        game_id, period, game_clock, heat_score, opponent_score, heat_stats
+    ))
+    return result
+
+
 @mcp.tool()
 async def post_heat_tweet(tweet_text: str, game_id: str, snapshot_id: int) -> Dict[str, Any]:
     """Post tweet (just prints in test mode)"""
-    print("\n" + "="*60)
-    print("🔥 WOULD POST TWEET:")
-    print("="*60)
-    print(tweet_text)
-    print("="*60 + "\n")
+    sys.stderr.write("\n".join([
+        "", "=" * 60, "🔥 WOULD POST TWEET:", "=" * 60,
+        tweet_text, "=" * 60, "", ""
+    ]))
     
     return {
         "success": True,
@@ -220,11 +239,10 @@ async def generate_random_shitpost() -> Dict[str, Any]:
     
     shitpost = random.choice(dummy_shitposts)
     
-    print("\n" + "="*60)
-    print("🎲 GENERATED RANDOM SHITPOST (TEST MODE):")
-    print("="*60)
-    print(shitpost)
-    print("="*60 + "\n")
+    sys.stderr.write("\n".join([
+        "", "=" * 60, "🎲 GENERATED RANDOM SHITPOST (TEST MODE):", "=" * 60,
+        shitpost, "=" * 60, "", ""
+    ]))
     
     return {
         "success": True,
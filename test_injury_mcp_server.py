@@ -4,26 +4,67 @@ Test MCP Server for Injury Monitoring - Uses dummy tweet data.
 
 Run with: python ai_agent.py test --injury
 """
-import json
-from typing import Optional, List, Dict, Any
+import re
+import sys
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from mcp.server.fastmcp import FastMCP
+from sqlalchemy import select
 
-from clients import TwitterClient
-from database import DatabaseManager, ProcessedTweet
+from analyzers.keyword_matcher import KeywordMatcher
+from database import DatabaseManager, ProcessedTweet, existing_values, insert_ignoring_duplicates
 from config import settings
+from utils import fast_json
+from utils.lazy import lazy_singleton
+from utils.timeutils import utc_now
 
 # Initialize MCP Server
 mcp = FastMCP("NBA-Agent-Injury-Test-Server")
 
-# Initialize clients
-twitter_client = TwitterClient()
-db_manager = DatabaseManager(settings.DATABASE_URL)
-db_manager.create_tables()
+# Nothing is posted in test mode, so no Twitter client; the database is
+# opened on first use so the server starts answering right away
+@lazy_singleton
+def get_db_manager() -> DatabaseManager:
+    """Database manager, creating any missing tables on first use."""
+    manager = DatabaseManager(settings.DATABASE_URL)
+    manager.create_tables()
+    return manager
+
 
 # Load test data
-with open("test_injury_data.json", "r") as f:
-    test_data = json.load(f)
+with open("test_injury_data.json", "rb") as f:
+    test_data = fast_json.loads(f.read())
+
+# Keyword heuristics used in place of the AI injury detector in test mode
+INJURY_KEYWORDS = (
+    "injury", "injured", "hurt", "sprain", "strain", "tear", "torn",
+    "surgery", "MRI", "out", "miss", "questionable", "doubtful", "ruled out"
+)
+_INJURY_MATCHER = KeywordMatcher(INJURY_KEYWORDS)
+
+INJURY_TYPES = {
+    "ankle": "ankle injury",
+    "knee": "knee injury",
+    "shoulder": "shoulder injury",
+    "thumb": "thumb injury",
+    "sprain": "sprain",
+    "strain": "strain",
+    "torn": "torn ligament",
+    "surgery": "surgery"
+}
+
+# Teams whose name marks where the player name ends in test tweets
+TEAM_NAMES = frozenset(("Lakers", "Warriors", "Celtics", "Heat", "Suns", "Bucks", "76ers", "Knicks"))
+
+# "Name will miss/undergo"
+PLAYER_BEFORE_VERB_PATTERN = re.compile(r"([A-Z][a-z]+ [A-Z][a-z]+(?:'s)?)\s+(?:will|has|underwent|suffered)")
+# "Team's Player Name"
+PLAYER_AFTER_TEAM_PATTERN = re.compile(r"(?:Lakers|Warriors|Celtics|Heat|Suns|Bucks|76ers|Knicks)(?:'s)?\s+([A-Z][a-z]+ [A-Z][a-z]+)")
+TIME_MISSED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"(\d+-\d+\s+(?:weeks|days|months))",
+    r"(\d+\s+(?:weeks|days|months))",
+    r"miss\s+(\d+\s+games?)",
+))
 
 
 @mcp.tool()
@@ -38,12 +79,20 @@ async def get_recent_tweets(username: str = "ShamsCharania", max_results: int =
     Returns:
         List of tweet dictionaries
     """
-    tweets = test_data["tweets"][:max_results]
-    return tweets
+    tweets = test_data["tweets"]
+    # The fixture list is never modified, so hand it out as is unless it needs trimming
+    return tweets if max_results >= len(tweets) else tweets[:max_results]
+
+
+def _score_injury(tweet_text: str) -> Tuple[bool, float]:
+    """Keyword-based (is_injury, confidence) for a tweet, used in place of the AI detector."""
+    # Confidence stops rising at 3 keywords, so stop counting there
+    keyword_count = _INJURY_MATCHER.count(tweet_text.lower(), limit=3)
+    return keyword_count >= 2, min(0.9, 0.5 + (keyword_count * 0.15))
 
 
 @mcp.tool()
-async def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
+def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
     """
     Analyze a tweet to determine if it contains injury information.
     In test mode, uses simple keyword matching instead of OpenAI.
@@ -55,25 +104,15 @@ async def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
         Dictionary with is_injury, confidence, and summary
     """
     # Simple keyword-based detection for testing
-    injury_keywords = [
-        "injury", "injured", "hurt", "sprain", "strain", "tear", "torn",
-        "surgery", "MRI", "out", "miss", "questionable", "doubtful", "ruled out"
-    ]
-    
-    text_lower = tweet_text.lower()
-    keyword_count = sum(1 for keyword in injury_keywords if keyword in text_lower)
-    
-    is_injury = keyword_count >= 2
-    confidence = min(0.9, 0.5 + (keyword_count * 0.15))
+    is_injury, confidence = _score_injury(tweet_text)
     
     # Extract player name (simple heuristic)
     words = tweet_text.split()
     player_name = "Unknown Player"
-    for i, word in enumerate(words):
-        if word in ["Lakers", "Warriors", "Celtics", "Heat", "Suns", "Bucks", "76ers", "Knicks"]:
-            if i > 0:
-                player_name = " ".join(words[max(0, i-2):i])
-                break
+    # First team name that has words before it (a set lookup per word)
+    team_index = next((i for i, word in enumerate(words) if i > 0 and word in TEAM_NAMES), None)
+    if team_index is not None:
+        player_name = " ".join(words[max(0, team_index-2):team_index])
     
     return {
         "is_injury": is_injury,
@@ -84,7 +123,7 @@ async def analyze_tweet_for_injury(tweet_text: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
-async def extract_injury_details(tweet_text: str) -> Dict[str, Any]:
+def extract_injury_details(tweet_text: str) -> Dict[str, Any]:
     """
     Extract specific injury details from a tweet.
     
@@ -100,45 +139,26 @@ async def extract_injury_details(tweet_text: str) -> Dict[str, Any]:
     time_missed = None
     
     # Extract player name (look for patterns like "Player Name will" or "Player Name (")
-    import re
-    
-    # Pattern 1: "Name will miss/undergo"
-    match = re.search(r"([A-Z][a-z]+ [A-Z][a-z]+(?:'s)?)\s+(?:will|has|underwent|suffered)", tweet_text)
+    match = PLAYER_BEFORE_VERB_PATTERN.search(tweet_text)
     if match:
         player_name = match.group(1).replace("'s", "")
     
     # Pattern 2: "Team's Player Name"
     if player_name == "Unknown Player":
-        match = re.search(r"(?:Lakers|Warriors|Celtics|Heat|Suns|Bucks|76ers|Knicks)(?:'s)?\s+([A-Z][a-z]+ [A-Z][a-z]+)", tweet_text)
+        match = PLAYER_AFTER_TEAM_PATTERN.search(tweet_text)
         if match:
             player_name = match.group(1)
     
     # Extract injury type
-    injury_keywords = {
-        "ankle": "ankle injury",
-        "knee": "knee injury",
-        "shoulder": "shoulder injury",
-        "thumb": "thumb injury",
-        "sprain": "sprain",
-        "strain": "strain",
-        "torn": "torn ligament",
-        "surgery": "surgery"
-    }
-    
-    for keyword, injury_name in injury_keywords.items():
-        if keyword in tweet_text.lower():
+    text_lower = tweet_text.lower()
+    for keyword, injury_name in INJURY_TYPES.items():
+        if keyword in text_lower:
             injury_type = injury_name
             break
     
     # Extract time missed
-    time_patterns = [
-        r"(\d+-\d+\s+(?:weeks|days|months))",
-        r"(\d+\s+(?:weeks|days|months))",
-        r"miss\s+(\d+\s+games?)",
-    ]
-    
-    for pattern in time_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
+    for pattern in TIME_MISSED_PATTERNS:
+        match = pattern.search(tweet_text)
         if match:
             time_missed = match.group(1)
             break
@@ -170,13 +190,12 @@ async def post_injury_tweet(player_name: str, injury_type: str, time_missed: Opt
         tweet_text = f"🏥 Injury Report: {player_name} - {injury_type}."
     
     # TEST MODE: Don't post to Twitter, just print
-    print("\n" + "=" * 60)
-    print("🧪 TEST MODE - Generated Injury Tweet (NOT posted):")
-    print("=" * 60)
-    print(tweet_text)
-    print("=" * 60)
-    print(f"Length: {len(tweet_text)} characters")
-    print("=" * 60 + "\n")
+    # One write for the whole block, to stderr: under stdio, stdout carries the MCP protocol
+    sys.stderr.write("\n".join([
+        "", "=" * 60, "🧪 TEST MODE - Generated Injury Tweet (NOT posted):", "=" * 60,
+        tweet_text, "=" * 60,
+        f"Length: {len(tweet_text)} characters", "=" * 60, "", ""
+    ]))
     
     return {
         "success": True,
@@ -198,8 +217,6 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
     Returns:
         Summary of processed tweets
     """
-    session = db_manager.get_session()
-    
     try:
         # Get test tweets
         tweets = test_data["tweets"]
@@ -207,38 +224,44 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
         injury_count = 0
         posted_count = 0
         processed_tweets = []
+        rows = []
+        # One timestamp for the whole batch
+        processed_at = utc_now()
+        
+        # Look up which tweets were already processed in one query
+        # (the session isn't held across the awaits below)
+        with get_db_manager().session_scope() as session:
+            processed_ids = existing_values(session, ProcessedTweet.tweet_id, (tweet['id'] for tweet in tweets))
         
         for tweet_data in tweets:
             tweet_id = tweet_data['id']
             tweet_text = tweet_data['text']
             
             # Check if already processed
-            existing = session.query(ProcessedTweet).filter_by(tweet_id=tweet_id).first()
-            if existing:
+            if tweet_id in processed_ids:
                 continue
             
-            # Analyze for injury
-            analysis = await analyze_tweet_for_injury(tweet_text)
-            is_injury = analysis.get('is_injury', False)
-            confidence = analysis.get('confidence', 0.0)
+            # Analyze for injury (just the score; extract_injury_details
+            # finds the player for the tweets that get posted)
+            is_injury, confidence = _score_injury(tweet_text)
             
-            # Create database record
-            processed_tweet = ProcessedTweet(
-                tweet_id=tweet_id,
-                author_username=username,
-                tweet_text=tweet_text,
-                is_injury_related=is_injury,
-                reposted=False,
-                repost_id="TEST_MODE_NO_POST" if is_injury else None,
-                processed_at=datetime.utcnow()
-            )
+            # Database row, inserted with the others after the loop
+            processed_tweet = {
+                "tweet_id": tweet_id,
+                "author_username": username,
+                "tweet_text": tweet_text,
+                "is_injury_related": is_injury,
+                "reposted": False,
+                "repost_id": "TEST_MODE_NO_POST" if is_injury else None,
+                "processed_at": processed_at
+            }
             
             # If injury-related and high confidence, "post" it
             if is_injury and confidence >= 0.7:
                 injury_count += 1
                 
                 # Extract details and post
-                details = await extract_injury_details(tweet_text)
+                details = extract_injury_details(tweet_text)
                 result = await post_injury_tweet(
                     details['player_name'],
                     details['injury_type'],
@@ -246,8 +269,8 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
                 )
                 
                 if result.get('success'):
-                    processed_tweet.reposted = True
-                    processed_tweet.repost_id = result['tweet_id']
+                    processed_tweet["reposted"] = True
+                    processed_tweet["repost_id"] = result['tweet_id']
                     posted_count += 1
                     
                     processed_tweets.append({
@@ -258,9 +281,10 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
                         "posted": True
                     })
             
-            session.add(processed_tweet)
+            rows.append(processed_tweet)
         
-        session.commit()
+        with get_db_manager().session_scope() as session:
+            insert_ignoring_duplicates(session, ProcessedTweet, rows)
         
         return {
             "new_tweets": len(tweets),
@@ -272,12 +296,9 @@ async def check_and_post_injury_tweets(username: str = "ShamsCharania") -> Dict[
         }
         
     except Exception as e:
-        session.rollback()
         return {
             "error": str(e)
         }
-    finally:
-        session.close()
 
 
 @mcp.tool()
@@ -285,29 +306,33 @@ async def get_processed_injury_tweets() -> List[Dict[str, Any]]:
     """
     Get all processed injury tweets from database.
     """
-    session = db_manager.get_session()
-    
-    try:
-        tweets = (
-            session.query(ProcessedTweet)
-            .filter_by(is_injury_related=True)
+    with get_db_manager().session_scope() as session:
+        # Only the columns returned, streamed in chunks rather than loaded as ORM objects
+        rows = session.execute(
+            select(
+                ProcessedTweet.tweet_id,
+                ProcessedTweet.author_username,
+                ProcessedTweet.tweet_text,
+                ProcessedTweet.reposted,
+                ProcessedTweet.repost_id,
+                ProcessedTweet.processed_at
+            )
+            .where(ProcessedTweet.is_injury_related.is_(True))
             .order_by(ProcessedTweet.processed_at.desc())
-            .all()
+            .execution_options(yield_per=500)
         )
         
         return [
             {
-                "tweet_id": tweet.tweet_id,
-                "author": tweet.author_username,
-                "text": tweet.tweet_text,
-                "reposted": tweet.reposted,
-                "repost_id": tweet.repost_id,
-                "processed_at": str(tweet.processed_at)
+                "tweet_id": tweet_id,
+                "author": author,
+                "text": text,
+                "reposted": reposted,
+                "repost_id": repost_id,
+                "processed_at": str(processed_at)
             }
-            for tweet in tweets
+            for tweet_id, author, text, reposted, repost_id, processed_at in rows
         ]
-    finally:
-        session.close()
 
 
 @mcp.tool()
@@ -345,12 +370,11 @@ async def generate_shams_shitpost(tweet_text: str) -> Dict[str, Any]:
     template = random.choice(shitpost_templates)
     shitpost = template.format(tweet_summary=summary)
     
-    print("\n" + "="*60)
-    print("🎲 GENERATED SHAMS SHITPOST (TEST MODE):")
-    print("="*60)
-    print(f"Original: {tweet_text[:100]}...")
-    print(f"Shitpost: {shitpost}")
-    print("="*60 + "\n")
+    sys.stderr.write("\n".join([
+        "", "=" * 60, "🎲 GENERATED SHAMS SHITPOST (TEST MODE):", "=" * 60,
+        f"Original: {tweet_text[:100]}...",
+        f"Shitpost: {shitpost}", "=" * 60, "", ""
+    ]))
     
     return {
         "success": True,
@@ -378,17 +402,15 @@ async def post_shams_shitpost(
     """
     is_reply = reply_to_tweet and bool(original_tweet_id)
     
-    print("\n" + "="*60)
-    if is_reply:
-        print("🔥 WOULD POST SHAMS SHITPOST (AS REPLY):")
-    else:
-        print("🔥 WOULD POST SHAMS SHITPOST (STANDALONE):")
-    print("="*60)
-    print(shitpost_text)
+    lines = [
+        "", "=" * 60,
+        "🔥 WOULD POST SHAMS SHITPOST (AS REPLY):" if is_reply else "🔥 WOULD POST SHAMS SHITPOST (STANDALONE):",
+        "=" * 60, shitpost_text
+    ]
     if is_reply:
-        print(f"\n💬 Replying to tweet ID: {original_tweet_id}")
-        print(f"   (This would show up in Shams' mentions!)")
-    print("="*60 + "\n")
+        lines += ["", f"💬 Replying to tweet ID: {original_tweet_id}", "   (This would show up in Shams' mentions!)"]
+    lines += ["=" * 60, "", ""]
+    sys.stderr.write("\n".join(lines))
     
     return {
         "success": True,
@@ -4,25 +4,47 @@ Test MCP Server - Uses dummy game data instead of real NBA API.
 
 Run with: python ai_agent.py test
 """
+import heapq
+import sys
 import json
+from operator import itemgetter
 from typing import Optional, List, Dict, Any
 from mcp.server.fastmcp import FastMCP
+from sqlalchemy import select
 
-from clients import TwitterClient
-from database import DatabaseManager, BoxScorePost
+from database import DatabaseManager, BoxScorePost, existing_values, insert_if_absent
 from config import settings
+from utils import fast_json
+from utils.lazy import lazy_singleton
+from utils.timeutils import parse_game_date, utc_now
 
 # Initialize MCP Server
 mcp = FastMCP("NBA-Agent-Test-Server")
 
-# Initialize clients (Twitter still real, NBA data is fake)
-twitter_client = TwitterClient()
-db_manager = DatabaseManager(settings.DATABASE_URL)
-db_manager.create_tables()
+# Nothing is posted in test mode, so no Twitter client; the database is
+# opened on first use so the server starts answering right away
+@lazy_singleton
+def get_db_manager() -> DatabaseManager:
+    """Database manager, creating any missing tables on first use."""
+    manager = DatabaseManager(settings.DATABASE_URL)
+    manager.create_tables()
+    return manager
+
 
 # Load test data
-with open("test_data.json", "r") as f:
-    test_data = json.load(f)
+with open("test_data.json", "rb") as f:
+    test_data = fast_json.loads(f.read())
+test_games_by_id = {g["game_id"]: g for g in test_data["games"]}
+# Parsed once here; the game dicts themselves stay JSON-serializable for the tools
+test_game_dates = {game_id: parse_game_date(g["game_date"]) for game_id, g in test_games_by_id.items()}
+# Player stats keyed by integer team ID, the shape BoxScoreFormatter expects
+test_team_stats = {
+    game_id: {int(team_id): players for team_id, players in g["player_stats"].items()}
+    for game_id, g in test_games_by_id.items()
+}
+
+# Badge suffix for a top performer, indexed by their number of double-digit stats
+PERFORMER_BADGES = ("", "", " 💪DD", " 🔥TRIPLE-DOUBLE")
 
 
 @mcp.tool()
@@ -50,19 +72,14 @@ async def get_game_box_score(game_id: str) -> Dict[str, Any]:
     """
     Returns test box score data for a game.
     """
-    game_data = next((g for g in test_data["games"] if g["game_id"] == game_id), None)
+    game_data = test_games_by_id.get(game_id)
     
     if not game_data:
         return {"error": f"Test game {game_id} not found"}
     
-    # Convert to format expected by the system
-    team_stats = {}
-    for team_id, players in game_data["player_stats"].items():
-        team_stats[int(team_id)] = players
-    
     return {
         "game_id": game_id,
-        "team_stats": team_stats,
+        "team_stats": test_team_stats[game_id],
     }
 
 
@@ -73,7 +90,7 @@ async def format_game_tweet(game_id: str) -> str:
     """
     from analyzers import BoxScoreFormatter
     
-    game_data = next((g for g in test_data["games"] if g["game_id"] == game_id), None)
+    game_data = test_games_by_id.get(game_id)
     if not game_data:
         return f"Error: Test game {game_id} not found"
     
@@ -88,11 +105,7 @@ async def format_game_tweet(game_id: str) -> str:
         "away_team_id": game_data["away_team_id"],
     }
     
-    # Build team_stats from test data
-    team_stats = {}
-    for team_id, players in game_data["player_stats"].items():
-        team_stats[int(team_id)] = players
-    
+    team_stats = test_team_stats[game_id]
     formatter = BoxScoreFormatter()
     if team_stats:
         tweet_text = formatter.format_game_with_top_performers(game, team_stats)
@@ -107,48 +120,38 @@ async def generate_custom_tweet(game_id: str, style: str = "exciting") -> str:
     """
     Generate custom tweet data for Claude to format.
     """
-    game_data = next((g for g in test_data["games"] if g["game_id"] == game_id), None)
+    game_data = test_games_by_id.get(game_id)
     if not game_data:
-        return json.dumps({"error": f"Test game {game_id} not found"})
+        return fast_json.dumps({"error": f"Test game {game_id} not found"})
     
     away_team = game_data["away_team"]
     home_team = game_data["home_team"]
     away_score = game_data["away_score"]
     home_score = game_data["home_score"]
     
-    # Find top performers
-    all_performances = []
-    for team_id, players in game_data["player_stats"].items():
-        team_name = away_team if team_id == str(game_data["away_team_id"]) else home_team
-        for player in players:
-            perf = {
-                "name": player["player_name"],
-                "team": team_name,
-                "pts": player["points"],
-                "reb": player["rebounds"],
-                "ast": player["assists"],
-                "stl": player["steals"],
-                "blk": player["blocks"]
-            }
-            double_digit = sum(1 for stat in [perf["pts"], perf["reb"], perf["ast"]] if stat >= 10)
-            perf["double_double"] = double_digit >= 2
-            perf["triple_double"] = double_digit >= 3
-            all_performances.append(perf)
-    
-    top_performers = sorted(all_performances, key=lambda x: x["pts"], reverse=True)[:3]
+    # Pick the top 3 scorers in one pass; only the winners are formatted
+    # (and get their team name resolved)
+    away_team_id = str(game_data["away_team_id"])
+    scorers = (
+        (player["points"], player, team_id)
+        for team_id, players in game_data["player_stats"].items()
+        for player in players
+    )
+    top_performers = []
+    for pts, player, team_id in heapq.nlargest(3, scorers, key=itemgetter(0)):
+        team_name = away_team if team_id == away_team_id else home_team
+        reb, ast = player["rebounds"], player["assists"]
+        double_digit = (pts >= 10) + (reb >= 10) + (ast >= 10)
+        top_performers.append(f"{player['player_name']} ({team_name}): {pts}p/{reb}r/{ast}a{PERFORMER_BADGES[double_digit]}")
     
     summary = {
         "matchup": f"{away_team} {away_score} @ {home_team} {home_score}",
         "winner": away_team if away_score > home_score else home_team,
         "margin": abs(away_score - home_score),
-        "top_performers": [
-            f"{p['name']} ({p['team']}): {p['pts']}p/{p['reb']}r/{p['ast']}a" +
-            (" 🔥TRIPLE-DOUBLE" if p["triple_double"] else " 💪DD" if p["double_double"] else "")
-            for p in top_performers
-        ]
+        "top_performers": top_performers
     }
     
-    return json.dumps(summary, indent=2)
+    return fast_json.dumps(summary)
 
 
 @mcp.tool()
@@ -156,62 +159,52 @@ async def post_custom_tweet(game_id: str, tweet_text: str) -> Dict[str, Any]:
     """
     Post a custom tweet. In TEST MODE, only generates and prints the tweet text without posting.
     """
-    session = db_manager.get_session()
-    
     try:
-        # Check if already posted (in test mode, we still track this)
-        existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-        if existing:
-            return {
-                "success": False,
-                "error": "Already posted",
-                "tweet_id": existing.tweet_id,
-                "note": "TEST MODE - Game already processed"
-            }
-        
         # Get game info
-        game_data = next((g for g in test_data["games"] if g["game_id"] == game_id), None)
+        game_data = test_games_by_id.get(game_id)
         if not game_data:
             return {"success": False, "error": f"Test game {game_id} not found"}
         
-        # TEST MODE: Don't post to Twitter, just print and simulate success
-        print("\n" + "=" * 60)
-        print("🧪 TEST MODE - Generated Tweet (NOT posted to Twitter):")
-        print("=" * 60)
-        print(tweet_text)
-        print("=" * 60)
-        print(f"Length: {len(tweet_text)} characters")
-        print("=" * 60 + "\n")
-        
-        # Save to database with test marker (so it won't try to post again)
-        from datetime import datetime
-        box_score_post = BoxScorePost(
-            game_id=game_id,
-            game_date=datetime.strptime(game_data["game_date"], "%Y-%m-%dT%H:%M:%S"),
-            home_team=game_data["home_team"],
-            away_team=game_data["away_team"],
-            home_score=game_data["home_score"],
-            away_score=game_data["away_score"],
-            post_text=tweet_text,
-            tweet_id="TEST_MODE_NO_POST",  # Fake tweet ID to mark as processed
-            posted_at=datetime.utcnow()
-        )
-        session.add(box_score_post)
-        session.commit()
-        
-        return {
-            "success": True,
-            "tweet_id": "TEST_MODE_NO_POST",
-            "game_id": game_id,
-            "tweet_text": tweet_text,
-            "note": "TEST MODE - Tweet generated but NOT posted to Twitter. See console output above."
-        }
-        
+        with get_db_manager().session_scope() as session:
+            # Save to database with test marker (so it won't try to post again);
+            # the INSERT ... ON CONFLICT DO NOTHING doubles as the already-posted check
+            claimed = insert_if_absent(session, BoxScorePost, {
+                "game_id": game_id,
+                "game_date": test_game_dates[game_id],
+                "home_team": game_data["home_team"],
+                "away_team": game_data["away_team"],
+                "home_score": game_data["home_score"],
+                "away_score": game_data["away_score"],
+                "post_text": tweet_text,
+                "tweet_id": "TEST_MODE_NO_POST",  # Fake tweet ID to mark as processed
+                "posted_at": utc_now()
+            })
+            if not claimed:
+                return {
+                    "success": False,
+                    "error": "Already posted",
+                    "tweet_id": session.scalar(select(BoxScorePost.tweet_id).where(BoxScorePost.game_id == game_id)),
+                    "note": "TEST MODE - Game already processed"
+                }
+            
+            # TEST MODE: Don't post to Twitter, just print and simulate success
+            # One write for the whole block, to stderr: under stdio, stdout carries the MCP protocol
+            sys.stderr.write("\n".join([
+                "", "=" * 60, "🧪 TEST MODE - Generated Tweet (NOT posted to Twitter):", "=" * 60,
+                tweet_text, "=" * 60,
+                f"Length: {len(tweet_text)} characters", "=" * 60, "", ""
+            ]))
+            
+            return {
+                "success": True,
+                "tweet_id": "TEST_MODE_NO_POST",
+                "game_id": game_id,
+                "tweet_text": tweet_text,
+                "note": "TEST MODE - Tweet generated but NOT posted to Twitter. See console output above."
+            }
+            
     except Exception as e:
-        session.rollback()
         return {"success": False, "error": str(e)}
-    finally:
-        session.close()
 
 
 @mcp.tool()
@@ -231,27 +224,36 @@ async def post_game_to_twitter(game_id: str) -> Dict[str, Any]:
 @mcp.tool()
 async def get_posted_games() -> List[Dict[str, Any]]:
     """
-    Get all posted games from database.
+    Get the 100 most recently posted games from database.
     """
-    session = db_manager.get_session()
-    
-    try:
-        posts = session.query(BoxScorePost).order_by(BoxScorePost.posted_at.desc()).all()
+    with get_db_manager().session_scope() as session:
+        # Only the columns returned, as plain rows rather than ORM objects
+        rows = session.execute(
+            select(
+                BoxScorePost.game_id,
+                BoxScorePost.home_team,
+                BoxScorePost.away_team,
+                BoxScorePost.home_score,
+                BoxScorePost.away_score,
+                BoxScorePost.tweet_id,
+                BoxScorePost.posted_at
+            )
+            .order_by(BoxScorePost.posted_at.desc())
+            .limit(100)
+        )
         
         return [
             {
-                "game_id": post.game_id,
-                "home_team": post.home_team,
-                "away_team": post.away_team,
-                "home_score": post.home_score,
-                "away_score": post.away_score,
-                "tweet_id": post.tweet_id,
-                "posted_at": str(post.posted_at)
+                "game_id": game_id,
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_score": home_score,
+                "away_score": away_score,
+                "tweet_id": tweet_id,
+                "posted_at": str(posted_at)
             }
-            for post in posts
+            for game_id, home_team, away_team, home_score, away_score, tweet_id, posted_at in rows
         ]
-    finally:
-        session.close()
 
 
 @mcp.tool()
@@ -259,16 +261,14 @@ async def check_for_new_games() -> Dict[str, Any]:
     """
     Check for test games that haven't been posted yet.
     """
-    session = db_manager.get_session()
-    
-    try:
-        all_games = test_data["games"]
+    with get_db_manager().session_scope() as session:
         new_games = []
         
-        for game_data in all_games:
-            game_id = game_data["game_id"]
-            existing = session.query(BoxScorePost).filter_by(game_id=game_id).first()
-            if not existing:
+        # One IN query for every game instead of one lookup per game
+        posted_ids = existing_values(session, BoxScorePost.game_id, test_games_by_id)
+        
+        for game_id, game_data in test_games_by_id.items():
+            if game_id not in posted_ids:
                 new_games.append({
                     "game_id": game_id,
                     "matchup": f"{game_data['away_team']} @ {game_data['home_team']}",
@@ -276,13 +276,11 @@ async def check_for_new_games() -> Dict[str, Any]:
                 })
         
         return {
-            "total_completed": len(all_games),
-            "already_posted": len(all_games) - len(new_games),
+            "total_completed": len(test_games_by_id),
+            "already_posted": len(test_games_by_id) - len(new_games),
             "new_games": new_games,
             "note": "TEST MODE - Using dummy data"
         }
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
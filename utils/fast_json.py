@@ -0,0 +1,26 @@
+"""
+JSON helpers that use orjson when it is installed.
+Falls back to the standard library so orjson stays optional.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to a JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    # Match orjson's output: compact separators, UTF-8 instead of \u escapes
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: Any) -> Any:
+    """Parse a JSON string (or bytes) into Python objects."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,30 @@
+"""
+Lazily built, process-wide singletons.
+"""
+import functools
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Turn a zero-argument factory into an accessor that builds its result on
+    first call and returns the same object afterwards.
+    
+    Unlike functools.cache, concurrent first calls (e.g. from asyncio.to_thread
+    workers) wait for one build instead of each running the factory.
+    """
+    lock = threading.Lock()
+    instance = []
+    
+    @functools.wraps(factory)
+    def accessor() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+    
+    return accessor
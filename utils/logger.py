@@ -11,12 +11,21 @@ def setup_logging():
     # Remove default handler
     logger.remove()
     
+    # enqueue=True: records are written by a background thread, so callers
+    # never block on console/file I/O (flush with logger.complete())
+    # Tracebacks only get loguru's extended frames and variable values with
+    # DEBUG_LOGS, and the file drops records below LOG_LEVEL without it
+    debug = settings.DEBUG_LOGS
+    
     # Add console handler with custom format
     logger.add(
         sys.stdout,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
         level=settings.LOG_LEVEL,
-        colorize=True
+        colorize=sys.stdout.isatty(),  # no ANSI markup when piped or under a service manager
+        backtrace=debug,
+        diagnose=debug,
+        enqueue=True
     )
     
     # Add file handler for persistent logs
@@ -25,8 +34,11 @@ def setup_logging():
         rotation="00:00",  # Rotate at midnight
         retention="30 days",  # Keep logs for 30 days
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
-        level="DEBUG",
-        compression="zip"  # Compress old logs
+        level="DEBUG" if debug else settings.LOG_LEVEL,
+        compression="zip",  # Compress old logs
+        backtrace=debug,
+        diagnose=debug,
+        enqueue=True
     )
     
     logger.info("Logging configured successfully")
@@ -0,0 +1,34 @@
+"""
+UTC time helpers.
+Database columns store naive UTC datetimes, so these return naive values too.
+"""
+from datetime import date, datetime, timezone
+from typing import Optional, Tuple
+
+
+def utc_now() -> datetime:
+    """Current time as a naive UTC datetime (replacement for datetime.utcnow())."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# (date, midnight) for the current UTC day, recomputed when the date rolls over
+_today_start_cache: Optional[Tuple[date, datetime]] = None
+
+
+def today_start_utc(now: Optional[datetime] = None) -> datetime:
+    """Midnight of the current UTC day as a naive datetime."""
+    global _today_start_cache
+    
+    today = (now or utc_now()).date()
+    if _today_start_cache is None or _today_start_cache[0] != today:
+        _today_start_cache = (today, datetime(today.year, today.month, today.day))
+    return _today_start_cache[1]
+
+
+def parse_game_date(value: str) -> datetime:
+    """
+    Parse an NBA API game date such as GAME_DATE_EST ("2024-01-15T00:00:00").
+    
+    fromisoformat() also accepts a bare date, and is much faster than strptime().
+    """
+    return datetime.fromisoformat(value.rstrip('Z'))
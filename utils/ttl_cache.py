@@ -0,0 +1,88 @@
+"""
+Small in-process TTL cache decorator for repeated API calls.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def ttl_cache(ttl_seconds: float = 120, maxsize: int = 256) -> Callable:
+    """
+    Cache a function's results in memory for ttl_seconds.
+    
+    Keyed on the call arguments (including self for methods). None and empty
+    results are not cached, since the NBA client returns those on errors.
+    Cached values are shared between callers, so don't mutate them.
+    
+    Concurrent misses for the same key are collapsed: one caller runs the
+    function while the others wait for and reuse its result.
+    
+    The wrapped function gets cache_info() and cache_clear(), like lru_cache.
+    
+    Args:
+        ttl_seconds: How long a result stays valid
+        maxsize: Max entries kept; the oldest entry is evicted first
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: "OrderedDict[Any, tuple]" = OrderedDict()
+        lock = threading.Lock()
+        in_flight = {}  # key -> lock held by the caller fetching that key
+        stats = {"hits": 0, "misses": 0}
+        
+        def lookup(key):
+            """Return (hit, value); must be called with lock held."""
+            entry = cache.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                stats["hits"] += 1
+                return True, entry[0]
+            return False, None
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, frozenset(kwargs.items())) if kwargs else args
+            
+            with lock:
+                hit, value = lookup(key)
+                if hit:
+                    return value
+                key_lock = in_flight.setdefault(key, threading.Lock())
+            
+            with key_lock:
+                # Another caller may have fetched it while we waited
+                with lock:
+                    hit, value = lookup(key)
+                    if hit:
+                        return value
+                    stats["misses"] += 1
+                
+                try:
+                    value = func(*args, **kwargs)
+                    if value:
+                        with lock:
+                            cache[key] = (value, time.monotonic() + ttl_seconds)
+                            cache.move_to_end(key)
+                            while len(cache) > maxsize:
+                                cache.popitem(last=False)
+                finally:
+                    with lock:
+                        in_flight.pop(key, None)
+            return value
+        
+        def cache_info() -> CacheInfo:
+            with lock:
+                return CacheInfo(stats["hits"], stats["misses"], maxsize, len(cache))
+        
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats["hits"] = stats["misses"] = 0
+        
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    
+    return decorator